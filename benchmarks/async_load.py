@@ -0,0 +1,76 @@
+"""
+Load generator for AsyncMachineRunner.
+
+A local stand-in client opens --clients concurrent sessions, each sending --requests small
+inputs back to back, and reports throughput and latency percentiles for the runner and,
+for comparison, for calling calculate() directly on the event loop.
+
+    python benchmarks/async_load.py --clients 1000 --requests 20 --batch 256 --wait 0.001
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from core.async_runner import AsyncMachineRunner
+from machines.mod_three_machine import ModThreeMachine
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+async def client(call, inputs, latencies):
+    for input_data in inputs:
+        started = time.perf_counter()
+        await call(input_data)
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(0)
+
+
+async def run_load(call, workload):
+    latencies = []
+    started = time.perf_counter()
+    await asyncio.gather(*(client(call, inputs, latencies) for inputs in workload))
+    return time.perf_counter() - started, sorted(latencies)
+
+
+def report(name, elapsed, latencies):
+    print(f"{name:>8}: {len(latencies) / elapsed:10.0f} req/s  "
+          f"p50 {percentile(latencies, 0.50) * 1e3:7.2f} ms  "
+          f"p99 {percentile(latencies, 0.99) * 1e3:7.2f} ms  "
+          f"max {latencies[-1] * 1e3:7.2f} ms")
+
+
+async def main(args):
+    rng = random.Random(args.seed)
+    workload = [
+        [format(rng.getrandbits(args.bits), "b") for _ in range(args.requests)]
+        for _ in range(args.clients)
+    ]
+
+    machine = ModThreeMachine()
+
+    async def direct(input_data):
+        return machine.calculate(input_data)
+
+    report("direct", *await run_load(direct, workload))
+
+    async with AsyncMachineRunner(ModThreeMachine(), max_batch_size=args.batch, max_wait=args.wait) as runner:
+        elapsed, latencies = await run_load(runner.calculate, workload)
+    report("runner", elapsed, latencies)
+    print(f"{'':>8}  {runner.batches} batches, {runner.items / max(runner.batches, 1):.1f} inputs/batch")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--bits", type=int, default=32)
+    parser.add_argument("--batch", type=int, default=256)
+    parser.add_argument("--wait", type=float, default=0.001)
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,53 @@
+"""
+Throughput benchmark for BulkRunner.
+
+Pushes --records random binary strings through ModThreeMachine with a plain calculate() loop,
+then through BulkRunner with 1, 2, 4, ... up to --processes workers, and reports records per
+second and the speedup over the single-worker run.
+
+    python benchmarks/bench_bulk.py --records 1000000 --processes 8
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from core.bulk_runner import BulkRunner
+from machines.mod_three_machine import ModThreeMachine
+
+
+def timed(run):
+    started = time.perf_counter()
+    count = sum(1 for _ in run())
+    return count, time.perf_counter() - started
+
+
+def main(args):
+    rng = random.Random(args.seed)
+    records = [format(rng.getrandbits(args.bits), "b") for _ in range(args.records)]
+
+    machine = ModThreeMachine()
+    count, elapsed = timed(lambda: map(machine.calculate, records))
+    print(f"{'calculate':>12}: {count / elapsed:12.0f} records/s")
+
+    baseline = None
+    processes = 1
+    while processes <= args.processes:
+        with BulkRunner(ModThreeMachine(), processes=processes, chunk_size=args.chunk) as runner:
+            count, elapsed = timed(lambda: runner.run(records))
+        rate = count / elapsed
+        baseline = baseline or rate
+        print(f"{processes:>3} workers: {rate:12.0f} records/s  speedup {rate / baseline:5.2f}x")
+        processes *= 2
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=1000000)
+    parser.add_argument("--bits", type=int, default=32)
+    parser.add_argument("--chunk", type=int, default=10000)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=0)
+    main(parser.parse_args())
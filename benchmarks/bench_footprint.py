@@ -0,0 +1,87 @@
+"""
+Memory benchmark for machine representations.
+
+Builds a random machine with --states states and --alphabet symbols per state, then measures
+each representation with tracemalloc (bytes allocated while building it and still held) next to
+the footprint() estimate for the same components:
+
+    table     TransitionTable + OutputMapping
+    compiled  CompiledMachine: state index, rows, interval indexes, regex/literal dispatch
+    dense     the array('i') chunks from CompiledMachine.dense() (literal matchers only)
+
+    python benchmarks/bench_footprint.py --states 10000 --alphabet 16 --matchers literal
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from core.compiled_machine import CompiledMachine
+from core.footprint import deep_sizeof
+from core.output_mapping import OutputMapping
+from core.state import State
+from core.transition_table import TransitionTable
+from core.types.input_type import CharRange
+
+
+def matchers(kind, count):
+    symbols = [chr(ord("a") + i) for i in range(count)]
+    if kind == "literal":
+        return symbols
+    if kind == "range":
+        return [CharRange(symbol, symbol) for symbol in symbols]
+    return [re.compile(f"{symbol}+") for symbol in symbols]
+
+
+def build_table(args):
+    rng = random.Random(args.seed)
+    states = [State(f"S{i}") for i in range(args.states)]
+    transitions = TransitionTable()
+    outputs = OutputMapping()
+    for state in states:
+        for matcher in matchers(args.matchers, args.alphabet):
+            transitions.add(state, matcher, rng.choice(states))
+        outputs.add(state, rng.randrange(3))
+    return states[0], transitions, outputs
+
+
+def traced(build):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def main(args):
+    (initial, transitions, outputs), table_bytes = traced(lambda: build_table(args))
+    compiled, compiled_bytes = traced(lambda: CompiledMachine(initial, transitions, outputs))
+    # The compiled form references the table's states and rules; count those under table only.
+    seen = set()
+    table_estimate = deep_sizeof(transitions, seen) + deep_sizeof(outputs, seen)
+    sizes = compiled.footprint(seen)
+    rows = [("table", table_bytes, table_estimate), ("compiled", compiled_bytes, sum(sizes.values()))]
+    if args.matchers == "literal":
+        _, dense_bytes = traced(compiled.dense)
+        rows.append(("dense", dense_bytes, compiled.footprint()["dense"]))
+
+    print(f"{args.states} states x {args.alphabet} {args.matchers} matchers")
+    print(f"{'representation':>15} {'traced':>14} {'footprint':>14}")
+    for name, traced_bytes, estimate in rows:
+        print(f"{name:>15} {traced_bytes:14,} {estimate:14,}")
+    print("compiled components (excluding table objects):")
+    for name, size in sizes.items():
+        print(f"{name:>15} {size:14,}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--states", type=int, default=10000)
+    parser.add_argument("--alphabet", type=int, default=16)
+    parser.add_argument("--matchers", choices=["literal", "range", "regex"], default="literal")
+    parser.add_argument("--seed", type=int, default=0)
+    main(parser.parse_args())
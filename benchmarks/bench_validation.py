@@ -0,0 +1,68 @@
+"""
+Validation benchmark for large machines.
+
+Builds a machine with --states states where state i goes to 2i and 2i+1 (mod --states) on "0"
+and "1", then times validation_report() on a machine that was never compiled (validated straight
+from its table) against compiling first and validating the compiled form. Compile time is part
+of the second measurement, since that is what a caller pays when nothing is compiled yet.
+
+    python benchmarks/bench_validation.py --states 100000 --repeat 3
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from core.finite_state_machine import FiniteStateMachine
+from core.output_mapping import OutputMapping
+from core.state import State
+from core.transition_table import TransitionTable
+
+
+class BenchFSM(FiniteStateMachine):
+    def calculate(self, input_symbol):
+        self.process(input_symbol)
+        return self.get_output()
+
+
+def build_machine(count):
+    states = [State(f"S{i}") for i in range(count)]
+    transitions = TransitionTable()
+    for i, state in enumerate(states):
+        transitions.add(state, "0", states[(2 * i) % count]).add(state, "1", states[(2 * i + 1) % count])
+    return BenchFSM(states[0], transitions, OutputMapping())
+
+
+def timed(run, count, repeat):
+    best = None
+    for _ in range(repeat):
+        machine = build_machine(count)
+        started = time.perf_counter()
+        report = run(machine)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, report
+
+
+def compile_then_validate(machine):
+    machine.compile()
+    return machine.validation_report()
+
+
+def main(args):
+    table_seconds, table_report = timed(lambda machine: machine.validation_report(), args.states, args.repeat)
+    compiled_seconds, compiled_report = timed(compile_then_validate, args.states, args.repeat)
+    assert vars(table_report) == vars(compiled_report)
+
+    print(f"{args.states} states, best of {args.repeat}, valid={table_report.is_valid()}")
+    print(f"{'validate from table':>26} {table_seconds:10.3f} s")
+    print(f"{'compile, then validate':>26} {compiled_seconds:10.3f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--states", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,118 @@
+import asyncio
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, AsyncIterable, AsyncIterator, Dict, List, Optional, Tuple
+
+from core.finite_state_machine import FiniteStateMachine
+
+
+def _run_batch(machine: FiniteStateMachine, inputs: List[Any]) -> Tuple[List[Any], Dict[int, BaseException]]:
+    """
+    Runs one micro-batch through calculate_many in a single pass and returns
+    (results, errors by position), so a bad request fails alone.
+    """
+    errors: Dict[int, BaseException] = {}
+    return machine.calculate_many(inputs, errors), errors
+
+
+class AsyncMachineRunner:
+    def __init__(self,
+                 machine: FiniteStateMachine,
+                 max_batch_size: int = 256,
+                 max_wait: float = 0.001,
+                 executor: Optional[Executor] = None):
+        """
+        Serves `await runner.calculate(x)` from an event loop without blocking it.
+        Concurrent calls are gathered into micro-batches of at most max_batch_size inputs,
+        or whatever arrived within max_wait seconds of the first one, and each batch runs
+        through the machine's calculate_many in the executor.
+        Machines are stateful, so the default executor is a single worker thread; pass a
+        ProcessPoolExecutor to run batches in parallel on per-process copies of the machine.
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        if max_wait < 0:
+            raise ValueError("max_wait must not be negative")
+        self.machine = machine
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="fsm-runner")
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+        self.batches = 0
+        self.items = 0
+
+    async def calculate(self, input_data: Any) -> Any:
+        """Queue one input for the next micro-batch and wait for its result."""
+        return await self.submit(input_data)
+
+    def submit(self, input_data: Any) -> asyncio.Future:
+        """Queue one input for the next micro-batch and return a future for its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((input_data, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return future
+
+    async def calculate_stream(self, inputs: AsyncIterable[Any]) -> AsyncIterator[Any]:
+        """
+        Yield the result for each input of an async iterator, in order.
+        Up to max_batch_size inputs are kept in flight so a stream fills batches on its own.
+        """
+        window = deque()
+        async for input_data in inputs:
+            window.append(self.submit(input_data))
+            if len(window) >= self.max_batch_size:
+                yield await window.popleft()
+        while window:
+            yield await window.popleft()
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        task = asyncio.get_running_loop().create_task(self._dispatch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        loop = asyncio.get_running_loop()
+        inputs = [input_data for input_data, _ in batch]
+        try:
+            results, errors = await loop.run_in_executor(self._executor, _run_batch, self.machine, inputs)
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        self.batches += 1
+        self.items += len(batch)
+        for position, (_, future) in enumerate(batch):
+            if future.done():
+                continue
+            if position in errors:
+                future.set_exception(errors[position])
+            else:
+                future.set_result(results[position])
+
+    async def aclose(self) -> None:
+        """Flush queued inputs, wait for in-flight batches and shut down the owned executor."""
+        self._flush()
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks))
+        if self._owns_executor:
+            self._executor.shutdown(wait=True)
+
+    async def __aenter__(self) -> "AsyncMachineRunner":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
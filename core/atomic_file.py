@@ -0,0 +1,27 @@
+import json
+import os
+import tempfile
+from typing import Any, Union
+
+
+def write_json_atomic(path: Union[str, os.PathLike], data: Any, **dump_options: Any) -> None:
+    """
+    Write data as JSON to path atomically: it goes to a uniquely named temporary file in the same
+    directory, which is flushed to disk and renamed over path, so readers see the old file or the
+    new one, never a partial write, and concurrent writers never share a temporary file.
+    """
+    path = os.fspath(path)
+    directory, name = os.path.split(os.path.abspath(path))
+    descriptor, temporary = tempfile.mkstemp(prefix=f".{name}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(descriptor, "w", encoding="utf-8") as handle:
+            json.dump(data, handle, **dump_options)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temporary, path)
+    except BaseException:
+        try:
+            os.remove(temporary)
+        except FileNotFoundError:
+            pass
+        raise
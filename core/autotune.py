@@ -0,0 +1,147 @@
+import json
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from core.atomic_file import write_json_atomic
+from core.compiled_machine import ENGINES
+from core.finite_state_machine import FiniteStateMachine
+
+
+class TuningResult:
+    def __init__(self,
+                 engine: str,
+                 seconds: Dict[str, float],
+                 bytes: Dict[str, int],
+                 skipped: Dict[str, str],
+                 memory_limit: Optional[int] = None,
+                 reused: bool = False):
+        """
+        Outcome of autotune(). engine is the chosen strategy; seconds holds the best time of each
+        benchmarked engine over the whole sample, bytes what the compiled form holds while running
+        each engine (the dense table only counts for "dense"), and skipped the reason an engine was
+        left out (unsupported, over the memory limit or disagreeing with the default engine).
+        reused is True when the decision was read from disk.
+        """
+        self.engine = engine
+        self.seconds = seconds
+        self.bytes = bytes
+        self.skipped = skipped
+        self.memory_limit = memory_limit
+        self.reused = reused
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "engine": self.engine,
+            "seconds": self.seconds,
+            "bytes": self.bytes,
+            "skipped": self.skipped,
+            "memory_limit": self.memory_limit,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TuningResult":
+        return cls(data["engine"], data["seconds"], data["bytes"], data["skipped"], data["memory_limit"], reused=True)
+
+    def __repr__(self):
+        return f"TuningResult(engine={self.engine!r}, seconds={self.seconds!r}, reused={self.reused})"
+
+
+def autotune(machine: FiniteStateMachine,
+             sample_inputs: Iterable[Any],
+             memory_limit: Optional[int] = None,
+             path: Union[str, os.PathLike, None] = None,
+             repeat: int = 3,
+             retune: bool = False) -> TuningResult:
+    """
+    Benchmark each engine of CompiledMachine.stepper on sample_inputs and set machine.engine to the
+    fastest whose compiled form fits in memory_limit bytes (as measured by footprint(); the dense
+    table is estimated with dense_bytes() and only built if it fits).
+    Samples are split once up front, so only stepping is timed; each engine runs the whole sample
+    repeat times and its best time counts. An engine whose final states differ from the default
+    "step" engine's is skipped.
+    With path, decisions are kept in a JSON file keyed by content_hash(): a saved decision for the
+    same definition and memory limit is applied without benchmarking unless retune is True.
+    """
+    key = machine.content_hash()
+    saved = _load(path) if path is not None else {}
+    if not retune and key in saved and saved[key].get("memory_limit") == memory_limit:
+        result = TuningResult.from_dict(saved[key])
+        machine.engine = result.engine
+        return result
+
+    compiled = machine.compile()
+    samples = [list(machine.splitter.split(input_data)) for input_data in sample_inputs]
+    initial_id = compiled.index[machine.initial_state]
+    seconds: Dict[str, float] = {}
+    sizes: Dict[str, int] = {}
+    skipped: Dict[str, str] = {}
+    current = compiled.footprint()
+    # The compiled form holds rows, intervals and dispatch whatever the engine; "dense" adds its table.
+    base = sum(size for component, size in current.items() if component != "dense")
+    had_dense = current["dense"] > 0
+    expected = None
+    for engine in ENGINES:
+        if engine == "dense":
+            dense_bytes = compiled.dense_bytes()
+            if dense_bytes is None:
+                skipped[engine] = "the table has non-literal matchers"
+                continue
+            sizes[engine] = base + dense_bytes
+        else:
+            sizes[engine] = base
+        if memory_limit is not None and sizes[engine] > memory_limit:
+            skipped[engine] = f"needs {sizes[engine]} bytes, over the limit of {memory_limit}"
+            continue
+        stepper = compiled.stepper(engine)
+        finals = _run(stepper, initial_id, samples)
+        if expected is None:
+            expected = finals
+        elif finals != expected:
+            skipped[engine] = "final states differ from the step engine"
+            continue
+        seconds[engine] = min(_timed(stepper, initial_id, samples) for _ in range(repeat))
+    if not seconds:
+        raise ValueError(f"No engine fits in memory_limit={memory_limit}: {skipped}")
+
+    result = TuningResult(min(seconds, key=seconds.get), seconds, sizes, skipped, memory_limit)
+    if result.engine != "dense" and not had_dense:
+        # Only built for the benchmark; do not keep paying for it.
+        compiled.drop_dense()
+    machine.engine = result.engine
+    if path is not None:
+        _save(path, key, result.to_dict())
+    return result
+
+
+def _run(stepper, initial_id: int, samples: List[List[Any]]) -> List[int]:
+    finals = []
+    for symbols in samples:
+        state_id = initial_id
+        for symbol in symbols:
+            state_id = stepper(state_id, symbol)
+            if state_id < 0:
+                break
+        finals.append(state_id)
+    return finals
+
+
+def _timed(stepper, initial_id: int, samples: List[List[Any]]) -> float:
+    started = time.perf_counter()
+    _run(stepper, initial_id, samples)
+    return time.perf_counter() - started
+
+
+def _load(path: Union[str, os.PathLike]) -> Dict[str, Dict[str, Any]]:
+    try:
+        with open(path, encoding="utf-8") as handle:
+            return json.load(handle)
+    except FileNotFoundError:
+        return {}
+
+
+def _save(path: Union[str, os.PathLike], key: str, decision: Dict[str, Any]) -> None:
+    # Other processes may have saved decisions since this one loaded the file: merge into the latest.
+    decisions = _load(path)
+    decisions[key] = decision
+    write_json_atomic(path, decisions, indent=2, sort_keys=True)
@@ -0,0 +1,149 @@
+import multiprocessing
+import os
+from collections import deque
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from core.finite_state_machine import FiniteStateMachine
+
+# Per-worker state, set once by _attach when the worker process starts.
+_worker = None
+
+
+class _WorkerTables:
+    def __init__(self, shm_name: str, width: int, alphabet: Dict[Any, int], initial_id: int,
+                 state_names: List[str], outputs: list, trap_flags: bytes, splitter):
+        self.shm = shared_memory.SharedMemory(name=shm_name)
+        self.table = self.shm.buf.cast('i') if width else ()
+        self.width = width
+        self.alphabet = alphabet
+        self.initial_id = initial_id
+        self.state_names = state_names
+        self.outputs = outputs
+        self.trap_flags = trap_flags
+        self.splitter = splitter
+
+
+def _attach(*args) -> None:
+    global _worker
+    _worker = _WorkerTables(*args)
+
+
+def _run_chunk(records: List[Any]) -> Tuple[List[Any], Dict[int, BaseException]]:
+    """Runs a chunk of records in a worker and returns (outputs, errors by position)."""
+    tables = _worker
+    table, width, column_of = tables.table, tables.width, tables.alphabet.get
+    outputs, trap_flags, split = tables.outputs, tables.trap_flags, tables.splitter.split
+    results: List[Any] = [None] * len(records)
+    errors: Dict[int, BaseException] = {}
+    for position, record in enumerate(records):
+        state_id = tables.initial_id
+        try:
+            for symbol in split(record):
+                try:
+                    column = column_of(symbol)
+                except TypeError:
+                    # Unhashable symbols match no literal, as in the dense stepper.
+                    column = None
+                next_id = -1 if column is None else table[state_id * width + column]
+                if next_id < 0:
+                    raise ValueError(f"No transition for {tables.state_names[state_id]} on '{symbol}'")
+                state_id = next_id
+            if trap_flags[state_id]:
+                raise outputs[state_id]("FSM ended in TRAP state!")
+        except Exception as exc:
+            errors[position] = exc
+            continue
+        results[position] = outputs[state_id]
+    return results, errors
+
+
+class BulkRunner:
+    def __init__(self,
+                 machine: FiniteStateMachine,
+                 processes: Optional[int] = None,
+                 chunk_size: int = 10000,
+                 max_pending: Optional[int] = None):
+        """
+        Runs large numbers of records through a machine on a process pool.
+        The machine's dense transition table is copied into shared memory once; each worker
+        attaches to it zero-copy when it starts, so only record chunks and results cross process
+        boundaries. Each record yields the output of the state it ends in, like process() followed
+        by get_output(). At most max_pending chunks (default: twice the pool size) are in flight,
+        which bounds memory when the record source is faster than the workers.
+        Only tables whose matchers are all literals (str, int, bool) can be densified; regex and
+        CharRange tables raise ValueError.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        compiled = machine.compile()
+        alphabet, table = compiled.dense_table()
+        outputs, trap_flags = compiled.output_table()
+        self.chunk_size = chunk_size
+        processes = processes or os.cpu_count() or 1
+        self._shm = shared_memory.SharedMemory(create=True, size=max(table.itemsize * len(table), 1))
+        if len(table):
+            self._shm.buf[:table.itemsize * len(table)] = table.tobytes()
+        try:
+            self._pool = multiprocessing.Pool(
+                processes,
+                initializer=_attach,
+                initargs=(
+                    self._shm.name, len(alphabet), alphabet, compiled.index[machine.initial_state],
+                    [str(state) for state in compiled.states], outputs, bytes(trap_flags),
+                    machine.splitter,
+                ),
+            )
+        except BaseException:
+            # Without a pool nobody will call close(), so release the segment here.
+            self._shm.close()
+            self._shm.unlink()
+            raise
+        self.max_pending = max_pending or 2 * processes
+
+    def run(self, records: Iterable[Any], return_errors: bool = False) -> Iterator[Any]:
+        """
+        Yield the output for each record, in input order, as chunks complete.
+        A record that fails raises its exception here, ending the run; with return_errors=True
+        the exception instance is yielded in its place instead.
+        """
+        pending = deque()
+        chunk: List[Any] = []
+        for record in records:
+            chunk.append(record)
+            if len(chunk) == self.chunk_size:
+                pending.append(self._pool.apply_async(_run_chunk, (chunk,)))
+                chunk = []
+                if len(pending) >= self.max_pending:
+                    yield from self._drain(pending.popleft(), return_errors)
+        if chunk:
+            pending.append(self._pool.apply_async(_run_chunk, (chunk,)))
+        while pending:
+            yield from self._drain(pending.popleft(), return_errors)
+
+    @staticmethod
+    def _drain(result, return_errors: bool) -> Iterator[Any]:
+        outputs, errors = result.get()
+        if not errors:
+            yield from outputs
+            return
+        for position, output in enumerate(outputs):
+            if position in errors:
+                if not return_errors:
+                    raise errors[position]
+                yield errors[position]
+            else:
+                yield output
+
+    def close(self) -> None:
+        """Stop the workers and release the shared transition table."""
+        self._pool.close()
+        self._pool.join()
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self) -> "BulkRunner":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,118 @@
+import codecs
+import json
+import os
+import time
+from typing import Any, BinaryIO, Optional, Union
+
+from core.atomic_file import write_json_atomic
+from core.finite_state_machine import FiniteStateMachine
+from core.types.output_type import OutputType
+
+Source = Union[str, os.PathLike, BinaryIO]
+
+
+class Checkpoint:
+    def __init__(self, machine_hash: str, state_id: int, state: str, offset: int, pending: str, symbols: int):
+        """
+        Snapshot of a stream run: the machine it belongs to (content hash), the current state
+        (ID and name), the byte offset of the next unread input, the splitter's partial-token
+        buffer and the number of symbols processed so far.
+        """
+        self.machine_hash = machine_hash
+        self.state_id = state_id
+        self.state = state
+        self.offset = offset
+        self.pending = pending
+        self.symbols = symbols
+
+    def save(self, path: Union[str, os.PathLike]) -> None:
+        """Write the checkpoint atomically (see write_json_atomic)."""
+        write_json_atomic(path, vars(self))
+
+    @classmethod
+    def load(cls, path: Union[str, os.PathLike]) -> "Checkpoint":
+        with open(path, encoding="utf-8") as handle:
+            return cls(**json.load(handle))
+
+
+def run_with_checkpoints(machine: FiniteStateMachine,
+                         source: Source,
+                         checkpoint_path: Union[str, os.PathLike],
+                         every_symbols: Optional[int] = 1_000_000,
+                         every_seconds: Optional[float] = 60.0,
+                         chunk_size: int = 1 << 20,
+                         encoding: str = "utf-8") -> OutputType:
+    """
+    Stream a file (path or seekable binary file object) through the machine, saving a checkpoint
+    to checkpoint_path whenever every_symbols symbols or every_seconds seconds have passed since
+    the last one. If checkpoint_path already exists the run resumes from it. Checkpoints are only
+    taken between chunks, so the per-symbol loop is the same as advance().
+    Returns get_output() for the final state and removes the checkpoint once the run completes.
+    Raises ValueError for splitters that are not incremental (see Splitter.incremental): they keep
+    the whole input pending, which every checkpoint would have to store.
+    """
+    if not machine.splitter.incremental:
+        raise ValueError(f"{type(machine.splitter).__name__} buffers the whole stream and cannot be checkpointed")
+    checkpoint = Checkpoint.load(checkpoint_path) if os.path.exists(checkpoint_path) else None
+    return _run(machine, source, checkpoint_path, checkpoint, every_symbols, every_seconds, chunk_size, encoding)
+
+
+def resume(machine: FiniteStateMachine,
+           source: Source,
+           checkpoint_path: Union[str, os.PathLike],
+           **options: Any) -> OutputType:
+    """
+    Continue a run from an existing checkpoint, seeking the source to the saved offset.
+    Takes the same options as run_with_checkpoints. Raises FileNotFoundError if there is
+    no checkpoint and ValueError if it was taken for a different machine.
+    """
+    if not os.path.exists(checkpoint_path):
+        raise FileNotFoundError(f"No checkpoint at {checkpoint_path}")
+    return run_with_checkpoints(machine, source, checkpoint_path, **options)
+
+
+def _run(machine, source, checkpoint_path, checkpoint, every_symbols, every_seconds, chunk_size, encoding):
+    machine_hash = machine.content_hash()
+    machine.reset()
+    offset, pending, symbols = 0, "", 0
+    if checkpoint is not None:
+        if checkpoint.machine_hash != machine_hash:
+            raise ValueError("Checkpoint was taken for a different machine")
+        machine.current_state = machine.compile().states[checkpoint.state_id]
+        if str(machine.current_state) != checkpoint.state:
+            raise ValueError(f"Checkpoint state {checkpoint.state} does not match state ID {checkpoint.state_id}")
+        offset, pending, symbols = checkpoint.offset, checkpoint.pending, checkpoint.symbols
+
+    handle = open(source, "rb") if isinstance(source, (str, os.PathLike)) else source
+    try:
+        handle.seek(offset)
+        decoder = codecs.getincrementaldecoder(encoding)()
+        feed = machine.splitter.feed
+        advance = machine.advance
+        next_symbols = symbols + every_symbols if every_symbols else None
+        next_time = time.monotonic() + every_seconds if every_seconds else None
+        while True:
+            data = handle.read(chunk_size)
+            final = not data
+            tokens, pending = feed(pending, decoder.decode(data, final=final), final)
+            if not isinstance(tokens, (str, list)):
+                tokens = list(tokens)
+            advance(tokens)
+            symbols += len(tokens)
+            offset += len(data)
+            if final:
+                break
+            if (next_symbols is not None and symbols >= next_symbols) or \
+                    (next_time is not None and time.monotonic() >= next_time):
+                # Bytes held by the decoder (a split multi-byte character) are re-read on resume.
+                state = machine.current_state
+                Checkpoint(machine_hash, machine.compile().index[state], str(state),
+                           offset - len(decoder.getstate()[0]), pending, symbols).save(checkpoint_path)
+                next_symbols = symbols + every_symbols if every_symbols else None
+                next_time = time.monotonic() + every_seconds if every_seconds else None
+    finally:
+        if handle is not source:
+            handle.close()
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return machine.get_output()
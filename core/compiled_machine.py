@@ -0,0 +1,379 @@
+from array import array
+from bisect import bisect_right
+import copy
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
+
+from core.footprint import component_sizes
+from core.interval_index import IntervalIndex
+from core.output_mapping import OutputMapping
+from core.rule_dispatch import RuleDispatch
+from core.state import State
+from core.transition_rule import TransitionRule
+from core.transition_table import TransitionTable
+from core.types.output_type import OutputType
+
+# Execution strategies for stepping through a compiled machine (see CompiledMachine.stepper).
+ENGINES = ("step", "scan", "dense")
+
+# The dense table is stored in chunks of 2**DENSE_CHUNK_BITS states, so patched() copies only the
+# chunks holding changed rows.
+DENSE_CHUNK_BITS = 6
+_DENSE_CHUNK_MASK = (1 << DENSE_CHUNK_BITS) - 1
+
+
+class CompiledMachine:
+    def __init__(self,
+                 initial_state: State,
+                 transitions: TransitionTable,
+                 output_mapping: Union[OutputMapping, Dict[State, OutputType], None]):
+        """
+        Builds an index-based form of a machine.
+        States are numbered (the initial state is 0, then table states in insertion order,
+        then states that only appear in the output mapping). Each state's rules point at target IDs;
+        where every rule of a state can be expressed as character ranges (single-character literals,
+        CharRange and plain regex character classes), single-character symbols are resolved with a
+        bisect over that state's IntervalIndex instead of trying the rules in turn. Other symbols go
+        through the state's RuleDispatch (one dict probe for literals, one call of a regex merging all
+        its regex rules); states whose rules cannot be merged keep the rule scan. States with only
+        literal rules get no IntervalIndex, since their dispatch dict already answers in one probe.
+        Outputs are held in a list indexed by state ID together with a flag per state whose
+        output is an exception class, so looking up an output is a single index. Plain dicts and
+        OutputMappings aliasing one can change without a version bump, so for those (live_outputs)
+        output() and output_value() read the mapping instead of the snapshot.
+        """
+        self.initial_state = initial_state
+        self.transitions = transitions
+        self.output_mapping = output_mapping
+        self.transitions_version = transitions._version
+        self.outputs_version = getattr(output_mapping, "_version", None)
+
+        self.states: List[State] = []
+        self.index: Dict[State, int] = {}
+        self._intern(initial_state)
+        intern, index, previous = self._intern, self.index, None
+        for rule in transitions.rules():
+            # Rules come grouped by from_state, so each source is interned once.
+            if rule.from_state is not previous:
+                previous = rule.from_state
+                intern(previous)
+            if rule.to_state not in index:
+                intern(rule.to_state)
+        mapping = dict(output_mapping.items()) if output_mapping is not None else {}
+        for state in mapping:
+            self._intern(state)
+
+        self.rules: List[Tuple[TransitionRule, ...]] = [tuple(transitions.get_rules(state)) for state in self.states]
+        self.rows: List[list] = []
+        self.intervals: List[Optional[IntervalIndex]] = []
+        self.dispatch: List[Optional[RuleDispatch]] = []
+        for rules in self.rules:
+            row, intervals, dispatch = self._compile_rules(rules)
+            self.rows.append(row)
+            self.intervals.append(intervals)
+            self.dispatch.append(dispatch)
+
+        self._set_outputs(output_mapping, mapping)
+        self._dense = None
+        self._steppers: Dict[str, Callable[[int, Any], int]] = {}
+
+    def _compile_rules(self, rules: Tuple[TransitionRule, ...]) -> Tuple[list, Optional[IntervalIndex], Optional[RuleDispatch]]:
+        row = [(rule.matches, self.index[rule.to_state]) for rule in rules]
+        if not rules:
+            return row, None, None
+        dispatch = RuleDispatch.for_rules(rules, row)
+        if dispatch is not None and dispatch.pattern is None and not dispatch.ranges:
+            # Literal rules only: the dispatch dict already answers in one probe.
+            return row, None, dispatch
+        return row, IntervalIndex.for_rules(rules, self.index), dispatch
+
+    def _set_outputs(self, output_mapping: Any, mapping: Dict[State, OutputType]) -> None:
+        self._mapping = mapping
+        self.live_outputs = isinstance(output_mapping, dict) or getattr(output_mapping, "_aliased", False)
+        self.outputs: List[OutputType] = [mapping.get(state) for state in self.states]
+        self.trap_flags = bytearray(_is_trap(output) for output in self.outputs)
+
+    def _intern(self, state: State) -> int:
+        if state not in self.index:
+            self.index[state] = len(self.states)
+            self.states.append(state)
+        return self.index[state]
+
+    def is_current(self, transitions: TransitionTable, output_mapping: Any, initial_state: Optional[State] = None) -> bool:
+        """
+        Return True if this compiled form still reflects the given table and output mapping (and,
+        if given, initial state).
+        """
+        return (
+            (initial_state is None or initial_state == self.initial_state)
+            and transitions is self.transitions
+            and output_mapping is self.output_mapping
+            and transitions._version == self.transitions_version
+            and getattr(output_mapping, "_version", None) == self.outputs_version
+        )
+
+    def step(self, state_id: int, symbol: Any) -> int:
+        """Return the target ID of the first rule of state_id matching symbol, or -1 if none does."""
+        intervals = self.intervals[state_id]
+        if intervals is not None and type(symbol) is str and len(symbol) == 1:
+            return intervals.targets[bisect_right(intervals.starts, ord(symbol)) - 1]
+        dispatch = self.dispatch[state_id]
+        if dispatch is not None:
+            return dispatch.resolve(symbol)
+        for matches, target in self.rows[state_id]:
+            if matches(symbol):
+                return target
+        return -1
+
+    def output(self, state_id: int) -> OutputType:
+        """Return the output of state_id, raising it instead if it is an exception class."""
+        if self.live_outputs:
+            output = self.output_mapping.get(self.states[state_id])
+            if _is_trap(output):
+                raise output("FSM ended in TRAP state!")
+            return output
+        if self.trap_flags[state_id]:
+            raise self.outputs[state_id]("FSM ended in TRAP state!")
+        return self.outputs[state_id]
+
+    def output_value(self, state_id: int) -> OutputType:
+        """Return the output mapped to state_id as is (exception classes are returned, not raised)."""
+        if self.live_outputs:
+            return self.output_mapping.get(self.states[state_id])
+        return self.outputs[state_id]
+
+    def output_table(self) -> Tuple[List[OutputType], bytearray]:
+        """Return (outputs, trap_flags) by state ID, read afresh from the mapping if live_outputs."""
+        if not self.live_outputs:
+            return self.outputs, self.trap_flags
+        outputs = [self.output_value(state_id) for state_id in range(len(self.states))]
+        return outputs, bytearray(_is_trap(output) for output in outputs)
+
+    def dense(self) -> Tuple[Dict[Any, int], List[array]]:
+        """
+        Return (alphabet, chunks): a column per distinct literal symbol and a list of array('i'),
+        each holding the rows of 2**DENSE_CHUNK_BITS consecutive states (the last one may hold
+        fewer), where chunks[state_id >> DENSE_CHUNK_BITS][(state_id & mask) * len(alphabet) + column]
+        is the target ID, or -1 for no transition. dense_table() joins them into one flat array.
+        The first matching rule wins, as in step(). Only tables whose matchers are all literals
+        (str, int, bool) can be densified; regex and range matchers raise ValueError.
+        """
+        if self._dense is None:
+            alphabet = self._dense_alphabet()
+            width = len(alphabet)
+            chunks = [array('i', [-1]) * (min(1 << DENSE_CHUNK_BITS, len(self.states) - start) * width)
+                      for start in range(0, len(self.states), 1 << DENSE_CHUNK_BITS)]
+            for state_id, rules in enumerate(self.rules):
+                _paint_dense_row(chunks, alphabet, state_id, rules, self.index)
+            self._dense = (alphabet, chunks)
+        return self._dense
+
+    def dense_table(self) -> Tuple[Dict[Any, int], array]:
+        """Return (alphabet, table) with the dense() chunks joined: table[state_id * len(alphabet) + column]."""
+        alphabet, chunks = self.dense()
+        table = array('i')
+        for chunk in chunks:
+            table.extend(chunk)
+        return alphabet, table
+
+    def dense_bytes(self) -> Optional[int]:
+        """
+        Return the size of the table dense() builds (states x alphabet x item size) without building
+        it, or None if the table cannot be densified.
+        """
+        if self._dense is not None:
+            return sum(len(chunk) * chunk.itemsize for chunk in self._dense[1])
+        try:
+            alphabet = self._dense_alphabet()
+        except ValueError:
+            return None
+        return len(self.states) * len(alphabet) * array('i').itemsize
+
+    def drop_dense(self) -> None:
+        """Release the dense table; dense() rebuilds it on next use."""
+        self._dense = None
+        self._steppers.pop("dense", None)
+
+    def _dense_alphabet(self) -> Dict[Any, int]:
+        alphabet: Dict[Any, int] = {}
+        for rules in self.rules:
+            for rule in rules:
+                if not isinstance(rule.input_matcher, (str, int)):
+                    raise ValueError(f"Cannot build a dense table for non-literal matcher {rule.input_matcher!r}")
+                alphabet.setdefault(rule.input_matcher, len(alphabet))
+        return alphabet
+
+    def stepper(self, engine: str = "step") -> Callable[[int, Any], int]:
+        """
+        Return a function (state_id, symbol) -> target ID or -1 implementing the named engine:
+        "step" is step() (interval index, then rule dispatch, then rule scan), "scan" tries the
+        state's rules in order, and "dense" looks the symbol up in the dense() table. A table that
+        cannot be densified (for instance after a live update added a CharRange rule) gets step()
+        for "dense". All engines give the same result.
+        """
+        stepper = self._steppers.get(engine)
+        if stepper is not None:
+            return stepper
+        if engine == "step":
+            stepper = self.step
+        elif engine == "scan":
+            rows = self.rows
+
+            def stepper(state_id: int, symbol: Any) -> int:
+                for matches, target in rows[state_id]:
+                    if matches(symbol):
+                        return target
+                return -1
+        elif engine == "dense":
+            try:
+                alphabet, chunks = self.dense()
+            except ValueError:
+                return self.step
+            width = len(alphabet)
+            column_of = alphabet.get
+
+            def stepper(state_id: int, symbol: Any) -> int:
+                try:
+                    column = column_of(symbol)
+                except TypeError:
+                    return -1
+                if column is None:
+                    return -1
+                return chunks[state_id >> DENSE_CHUNK_BITS][(state_id & _DENSE_CHUNK_MASK) * width + column]
+        else:
+            raise ValueError(f"Unknown engine '{engine}', expected one of {ENGINES}")
+        self._steppers[engine] = stepper
+        return stepper
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Steppers are closures and cannot be pickled; they are rebuilt on first use.
+        state = dict(vars(self))
+        state["_steppers"] = {}
+        return state
+
+    def footprint(self, seen: Optional[Set[int]] = None) -> Dict[str, int]:
+        """
+        Return the estimated bytes held by each component of this compiled form:
+        states (state list and index), matchers, rules, rows, intervals, dispatch (merged regexes and
+        literal dicts), outputs (output list, trap flags and mapping snapshot) and dense (0 until
+        dense() is first called). An object reachable from several components is counted once, in
+        the first; pass seen to share that accounting with other objects. Compiled forms produced by
+        patched() share unchanged rows with their predecessor, and each reports them in full.
+        """
+        return component_sizes([
+            ("states", (self.states, self.index)),
+            ("matchers", tuple(rule.input_matcher for rules in self.rules for rule in rules)),
+            ("rules", (self.rules,)),
+            ("rows", (self.rows,)),
+            ("intervals", (self.intervals,)),
+            ("dispatch", (self.dispatch,)),
+            ("outputs", (self.outputs, self.trap_flags, self._mapping)),
+            ("dense", (self._dense,)),
+        ], seen)
+
+    def bound_to(self, transitions: TransitionTable, output_mapping: Any) -> "CompiledMachine":
+        """
+        Return a shallow copy serving another machine whose table and outputs have the same content
+        (see FiniteStateMachine.content_hash), so is_current() and patched() follow that machine's
+        objects. States, rows, indexes and dispatchers are shared, not copied. Outputs are read
+        again from output_mapping (O(states)): equal content hashes only mean equal reprs, and
+        outputs may be mutable objects that must not leak between machines.
+        """
+        view = copy.copy(self)
+        view._steppers = {}
+        view.transitions, view.output_mapping = transitions, output_mapping
+        view._set_outputs(output_mapping, dict(output_mapping.items()) if output_mapping is not None else {})
+        view.transitions_version = transitions._version
+        view.outputs_version = getattr(output_mapping, "_version", None)
+        return view
+
+    def patched(self,
+                transitions: TransitionTable,
+                output_mapping: Any,
+                initial_state: Optional[State] = None) -> Optional["CompiledMachine"]:
+        """
+        Return a new compiled form that reflects the changes made to transitions since this one was
+        built, rebuilding only the rows, interval indexes and dense-table rows of the states whose
+        rules changed. States keep their IDs; new target states are appended.
+        The per-state lists are copied (O(states) pointers); of the dense table only the chunks
+        holding changed or added rows are copied, so the rest of the patch is proportional to the
+        change rather than to states x alphabet.
+        This instance is not modified, so runs already holding it finish on the old version.
+        Returns None if a full rebuild is needed: a different initial state, table or output mapping,
+        a changed output mapping, or changes older than the table's change log.
+        """
+        if initial_state is not None and initial_state != self.initial_state:
+            return None
+        if transitions is not self.transitions or output_mapping is not self.output_mapping \
+                or getattr(output_mapping, "_version", None) != self.outputs_version:
+            return None
+        changed = transitions.changes_since(self.transitions_version)
+        if changed is None:
+            return None
+        new = copy.copy(self)
+        new._steppers = {}
+        new.transitions_version = transitions._version
+        changed_rules = {state: tuple(transitions.get_rules(state)) for state in changed}
+        candidates = list(changed) + [rule.to_state for rules in changed_rules.values() for rule in rules]
+        added = [state for state in dict.fromkeys(candidates) if state not in self.index]
+        new.rules, new.rows = list(self.rules), list(self.rows)
+        new.intervals, new.dispatch = list(self.intervals), list(self.dispatch)
+        if added:
+            new.states, new.index = list(self.states), dict(self.index)
+            new.outputs, new.trap_flags = list(self.outputs), bytearray(self.trap_flags)
+            for state in added:
+                new._intern(state)
+                new.rules.append(())
+                new.rows.append([])
+                new.intervals.append(None)
+                new.dispatch.append(None)
+                new.outputs.append(self._mapping.get(state))
+                new.trap_flags.append(_is_trap(new.outputs[-1]))
+        for state, rules in changed_rules.items():
+            state_id = new.index[state]
+            new.rules[state_id] = rules
+            new.rows[state_id], new.intervals[state_id], new.dispatch[state_id] = new._compile_rules(rules)
+        new._dense = self._patched_dense(new, changed_rules, len(added))
+        return new
+
+    def _patched_dense(self, new: "CompiledMachine", changed_rules: Dict[State, tuple], added: int):
+        if self._dense is None:
+            return None
+        alphabet, chunks = self._dense
+        if any(rule.input_matcher not in alphabet or not isinstance(rule.input_matcher, (str, int))
+               for rules in changed_rules.values() for rule in rules):
+            # A new symbol (or matcher kind) changes the alphabet classes: rebuild lazily.
+            return None
+        chunks = list(chunks)
+        owned: Set[int] = set()
+
+        def own(chunk_id: int) -> array:
+            if chunk_id == len(chunks):
+                chunks.append(array('i'))
+            elif chunk_id not in owned:
+                chunks[chunk_id] = array('i', chunks[chunk_id])
+            owned.add(chunk_id)
+            return chunks[chunk_id]
+
+        empty_row = array('i', [-1]) * len(alphabet)
+        for state_id in range(len(self.states), len(self.states) + added):
+            own(state_id >> DENSE_CHUNK_BITS).extend(empty_row)
+        for state, rules in changed_rules.items():
+            state_id = new.index[state]
+            own(state_id >> DENSE_CHUNK_BITS)
+            _paint_dense_row(chunks, alphabet, state_id, rules, new.index)
+        return alphabet, chunks
+
+
+def _is_trap(output: OutputType) -> bool:
+    return isinstance(output, type) and issubclass(output, Exception)
+
+
+def _paint_dense_row(chunks: List[array], alphabet: Dict[Any, int], state_id: int, rules, index: Dict[State, int]) -> None:
+    width = len(alphabet)
+    table = chunks[state_id >> DENSE_CHUNK_BITS]
+    start = (state_id & _DENSE_CHUNK_MASK) * width
+    table[start:start + width] = array('i', [-1]) * width
+    for rule in rules:
+        cell = start + alphabet[rule.input_matcher]
+        if table[cell] < 0:
+            table[cell] = index[rule.to_state]
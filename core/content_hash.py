@@ -0,0 +1,45 @@
+import hashlib
+import re
+from typing import Any, List
+
+from core.state import State
+from core.transition_table import TransitionTable
+from core.types.input_type import CharRange
+
+
+def machine_content_hash(initial_state: State, transitions: TransitionTable, output_mapping: Any, splitter: Any) -> str:
+    """
+    Return a SHA-256 hex digest of a canonical description of a machine: its initial state,
+    its rules in table order (order decides which rule wins), its outputs sorted by state name
+    and its splitter class and settings. Equal definitions built in different processes hash the same,
+    as long as their outputs have stable reprs (plain values and exception classes do; lambdas do not).
+    """
+    lines: List[str] = [f"initial {initial_state.name!r}"]
+    for rule in transitions.rules():
+        lines.append(f"rule {rule.from_state.name!r} {_canonical_matcher(rule.input_matcher)} {rule.to_state.name!r}")
+    if output_mapping is not None:
+        outputs = sorted((state.name, _canonical_output(output)) for state, output in output_mapping.items())
+        lines.extend(f"output {name!r} {output}" for name, output in outputs)
+    settings = sorted(vars(splitter).items()) if splitter is not None else []
+    lines.append(f"splitter {_qualified_name(type(splitter))} {settings!r}")
+    return hashlib.sha256("\n".join(lines).encode("utf-8")).hexdigest()
+
+
+def _canonical_matcher(matcher: Any) -> str:
+    if isinstance(matcher, re.Pattern):
+        return f"re:{matcher.flags}:{matcher.pattern!r}"
+    if isinstance(matcher, CharRange):
+        return f"range:{matcher.first!r}:{matcher.last!r}"
+    if isinstance(matcher, list):
+        return "list:[" + ",".join(_canonical_matcher(m) for m in matcher) + "]"
+    return f"{type(matcher).__name__}:{matcher!r}"
+
+
+def _canonical_output(output: Any) -> str:
+    if isinstance(output, type):
+        return f"type:{_qualified_name(output)}"
+    return f"{type(output).__name__}:{output!r}"
+
+
+def _qualified_name(cls: type) -> str:
+    return f"{cls.__module__}.{cls.__qualname__}"
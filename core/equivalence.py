@@ -0,0 +1,137 @@
+import re
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from core.compiled_machine import CompiledMachine
+from core.finite_state_machine import FiniteStateMachine
+from core.interval_index import MAX_CODEPOINT, matcher_ranges
+from core.splitter import StringSplitter
+from core.types.output_type import OutputType
+
+# Output of the implicit sink reached when no rule matches (calculate raises ValueError there).
+NO_TRANSITION = object()
+
+
+class EquivalenceResult:
+    def __init__(self, equivalent: bool, counterexample: Optional[List[Any]] = None,
+                 outputs: Optional[Tuple[Any, Any]] = None):
+        """
+        Result of comparing two machines. When they differ, counterexample is a shortest list of
+        symbols on which they disagree and outputs holds what each machine ends with on it
+        (NO_TRANSITION where it has no transition).
+        """
+        self.equivalent = equivalent
+        self.counterexample = counterexample
+        self.outputs = outputs
+
+    def __bool__(self) -> bool:
+        return self.equivalent
+
+    def __repr__(self):
+        if self.equivalent:
+            return "EquivalenceResult(equivalent=True)"
+        return f"EquivalenceResult(equivalent=False, counterexample={self.counterexample!r}, outputs={self.outputs!r})"
+
+
+def equivalent(machine_a: FiniteStateMachine, machine_b: FiniteStateMachine,
+               alphabet: Optional[Iterable[Any]] = None) -> EquivalenceResult:
+    """
+    Decide whether two machines produce the same output (or both fail) on every input, using
+    Hopcroft-Karp union-find over the product of their compiled tables, in near-linear time.
+    If they differ, a breadth-first search over the product returns a shortest distinguishing input.
+
+    The symbols tried are the literal matchers of both tables plus one representative character
+    per range boundary of CharRange and character-class regex rules. Regex rules also accept
+    multi-character tokens by prefix, which cannot be enumerated, so they are only supported when
+    both machines split input into single characters (StringSplitter); otherwise pass alphabet.
+    """
+    compiled_a, compiled_b = machine_a.compile(), machine_b.compile()
+    symbols = list(alphabet) if alphabet is not None else _alphabet(machine_a, machine_b)
+    start_a = compiled_a.index[machine_a.initial_state]
+    start_b = compiled_b.index[machine_b.initial_state]
+    # Node IDs for union-find: machine A's states, its sink, then machine B's states and sink.
+    count_a = len(compiled_a.states) + 1
+    parent = list(range(count_a + len(compiled_b.states) + 1))
+
+    def find(node: int) -> int:
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    def node_b(state_id: int) -> int:
+        return count_a + (state_id if state_id >= 0 else len(compiled_b.states))
+
+    def node_a(state_id: int) -> int:
+        return state_id if state_id >= 0 else count_a - 1
+
+    parent[find(node_a(start_a))] = find(node_b(start_b))
+    pending = [(start_a, start_b)]
+    while pending:
+        state_a, state_b = pending.pop()
+        if not _same_output(_output(compiled_a, state_a), _output(compiled_b, state_b)):
+            return _counterexample(compiled_a, compiled_b, start_a, start_b, symbols)
+        for symbol in symbols:
+            next_a, next_b = _step(compiled_a, state_a, symbol), _step(compiled_b, state_b, symbol)
+            root_a, root_b = find(node_a(next_a)), find(node_b(next_b))
+            if root_a != root_b:
+                parent[root_a] = root_b
+                pending.append((next_a, next_b))
+    return EquivalenceResult(True)
+
+
+def _counterexample(compiled_a: CompiledMachine, compiled_b: CompiledMachine,
+                    start_a: int, start_b: int, symbols: List[Any]) -> EquivalenceResult:
+    previous: Dict[Tuple[int, int], Optional[Tuple[Tuple[int, int], Any]]] = {(start_a, start_b): None}
+    queue = deque([(start_a, start_b)])
+    while queue:
+        pair = queue.popleft()
+        outputs = (_output(compiled_a, pair[0]), _output(compiled_b, pair[1]))
+        if not _same_output(*outputs):
+            path = []
+            while previous[pair] is not None:
+                pair, symbol = previous[pair]
+                path.append(symbol)
+            return EquivalenceResult(False, path[::-1], outputs)
+        for symbol in symbols:
+            next_pair = (_step(compiled_a, pair[0], symbol), _step(compiled_b, pair[1], symbol))
+            if next_pair not in previous:
+                previous[next_pair] = (pair, symbol)
+                queue.append(next_pair)
+    raise AssertionError("machines differ but no distinguishing input was found")
+
+
+def _step(compiled: CompiledMachine, state_id: int, symbol: Any) -> int:
+    return compiled.step(state_id, symbol) if state_id >= 0 else -1
+
+
+def _output(compiled: CompiledMachine, state_id: int) -> OutputType:
+    return compiled.output_value(state_id) if state_id >= 0 else NO_TRANSITION
+
+
+def _same_output(output_a: OutputType, output_b: OutputType) -> bool:
+    if output_a is NO_TRANSITION or output_b is NO_TRANSITION:
+        return output_a is output_b
+    return output_a == output_b
+
+
+def _alphabet(machine_a: FiniteStateMachine, machine_b: FiniteStateMachine) -> List[Any]:
+    # With StringSplitter every symbol is one character, so longer literals can never occur.
+    single_characters = all(type(m.splitter) is StringSplitter for m in (machine_a, machine_b))
+    symbols: Dict[Any, None] = {}
+    cuts = set()
+    for compiled in (machine_a.compile(), machine_b.compile()):
+        for rules in compiled.rules:
+            for rule in rules:
+                matcher = rule.input_matcher
+                ranges = matcher_ranges(matcher)
+                if ranges is None or (isinstance(matcher, re.Pattern) and not single_characters):
+                    raise ValueError(f"Cannot enumerate the symbols {matcher!r} accepts; pass alphabet explicitly")
+                if isinstance(matcher, (str, int)) and not (single_characters and ranges == []):
+                    symbols[matcher] = None
+                for low, high in ranges:
+                    cuts.update((low, high + 1))
+    cuts.discard(MAX_CODEPOINT + 1)
+    for cut in sorted(cuts):
+        symbols.setdefault(chr(cut), None)
+    return list(symbols)
@@ -1,21 +1,81 @@
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, Iterator, List, MutableSequence, Optional
 
 from core.transition_table import TransitionTable
 from core.output_mapping import OutputMapping
+from core.compiled_machine import CompiledMachine
+from core.content_hash import machine_content_hash
+from core.footprint import component_sizes
+from core.validation import ValidationReport, validate_compiled, validate_table
+from core.types.output_type import OutputType
 from .state import State
 from .abstract_finite_state_machine import AbstractFiniteStateMachine
 from core.splitter import Splitter, StringSplitter
 
 class FiniteStateMachine(AbstractFiniteStateMachine):
+    # Set in the class body that defines a calculate() equal to process() followed by get_output(), so
+    # calculate_many() can run batches on state IDs. Only honoured by the class defining calculate():
+    # a subclass overriding calculate() falls back to calling it per input unless it sets it again.
+    calculate_returns_output = False
+
     def __init__(self, 
                  initial_state: State, 
                  transitions: TransitionTable,
                  output_mapping: OutputMapping,
                  splitter: Splitter = None):
         super().__init__(output_mapping)
-        self.current_state = self.initial_state = initial_state
+        self.initial_state = initial_state
         self.transitions = transitions
         self.splitter = splitter or StringSplitter()
+        # Compiled on first use (or taken from a MachineCache); the initial state always has ID 0.
+        self._compiled = None
+        self._state_id = 0
+        # Execution strategy used by advance() and the transducers; see CompiledMachine.stepper and core.autotune.
+        self.engine = "step"
+
+    @property
+    def output_mapping(self) -> OutputMapping:
+        return self._output_mapping
+
+    @output_mapping.setter
+    def output_mapping(self, output_mapping) -> None:
+        # Plain dicts (as the bundled machines use) are wrapped in an OutputMapping that aliases them,
+        # so changes made through the dict or the mapping are both seen.
+        if isinstance(output_mapping, dict):
+            output_mapping = OutputMapping.from_dict(output_mapping)
+        self._output_mapping = output_mapping
+
+    @property
+    def current_state(self) -> State:
+        return self.compile().states[self._state_id]
+
+    @current_state.setter
+    def current_state(self, state: State) -> None:
+        compiled = self.compile()
+        if state not in compiled.index:
+            raise ValueError(f"Unknown state {state}")
+        self._state_id = compiled.index[state]
+
+    def compile(self) -> CompiledMachine:
+        """
+        Returns the compiled, index-based form of this FSM.
+        It is built on first use. When only the transition table changed since, the previous form is
+        patched copy-on-write (see CompiledMachine.patched) so runs in flight keep the old version;
+        any other change rebuilds it.
+        """
+        compiled = self._compiled
+        if compiled is None or not compiled.is_current(self.transitions, self.output_mapping, self.initial_state):
+            patched = None
+            if compiled is not None:
+                patched = compiled.patched(self.transitions, self.output_mapping, self.initial_state)
+            if patched is not None:
+                # State IDs are stable across patches; publishing is a single assignment.
+                self._compiled = patched
+            else:
+                current = compiled.states[self._state_id] if compiled is not None else None
+                self._compiled = CompiledMachine(self.initial_state, self.transitions, self.output_mapping)
+                if current is not None:
+                    self._state_id = self._compiled.index.get(current, 0)
+        return self._compiled
 
     def reset(self) -> None:
         self.current_state = self.initial_state
@@ -23,56 +83,169 @@ class FiniteStateMachine(AbstractFiniteStateMachine):
 
     def process(self, input_data: Any):
         self.reset()
-        for symbol in self.splitter.split(input_data):
-            rules = self.transitions.get_rules(self.current_state)
-            for rule in rules:
-                if rule.matches(symbol):
-                    self.current_state = rule.to_state
-                    break
+        self.advance(self.splitter.split(input_data))
+
+    def advance(self, symbols: Iterable[Any]) -> None:
+        """
+        Feeds already-split symbols from the current state, without resetting first.
+        Used to continue a run chunk by chunk; process() is reset() followed by advance().
+        """
+        compiled = self.compile()
+        self._walk(compiled, compiled.stepper(self.engine), self._state_id, symbols)
+
+    def _walk(self, compiled: CompiledMachine, step, state_id: int, symbols: Iterable[Any]) -> int:
+        # Steps from state_id over symbols and returns the final state ID. The machine is left in the
+        # last state reached, also when a missing transition raises.
+        for symbol in symbols:
+            next_id = step(state_id, symbol)
+            if next_id < 0:
+                self._state_id = state_id
+                raise _no_transition(compiled, state_id, symbol)
+            state_id = next_id
+        self._state_id = state_id
+        return state_id
+
+    def _trace(self, compiled: CompiledMachine, symbols: Iterable[Any]) -> Iterator[int]:
+        # Like _walk from the current state, but yields each state ID reached and keeps the machine on it.
+        step = compiled.stepper(self.engine)
+        state_id = self._state_id
+        for symbol in symbols:
+            next_id = step(state_id, symbol)
+            if next_id < 0:
+                raise _no_transition(compiled, state_id, symbol)
+            state_id = self._state_id = next_id
+            yield state_id
+
+    def get_output(self) -> OutputType:
+        """Returns the output associated with the current state."""
+        if self.output_mapping is None:
+            raise NotImplementedError("Output mapping is not defined for this FSM.")
+        return self.compile().output(self._state_id)
+
+    def transduce(self, input_data: Any) -> Iterator[OutputType]:
+        """
+        Lazily processes the input, yielding the output of the state reached after each symbol.
+        The current state follows the stream, so once it is exhausted get_output() matches calculate().
+        """
+        if self.output_mapping is None:
+            raise NotImplementedError("Output mapping is not defined for this FSM.")
+        self.reset()
+        compiled = self._compiled
+        output = compiled.output
+        for state_id in self._trace(compiled, self.splitter.split(input_data)):
+            yield output(state_id)
+
+    def transduce_into(self, input_data: Any, out: MutableSequence) -> int:
+        """
+        Processes the input, writing the output after each symbol into the preallocated buffer out
+        (a list, array.array or NumPy array). Returns the number of outputs written.
+        Raises IndexError if the buffer is shorter than the tokenized input.
+        """
+        if self.output_mapping is None:
+            raise NotImplementedError("Output mapping is not defined for this FSM.")
+        self.reset()
+        compiled = self._compiled
+        # Outputs aliasing a caller's dict are read live, one lookup per symbol.
+        outputs, trap_flags = (None, None) if compiled.live_outputs else (compiled.outputs, compiled.trap_flags)
+        count = 0
+        for state_id in self._trace(compiled, self.splitter.split(input_data)):
+            if outputs is None:
+                out[count] = compiled.output(state_id)
             else:
-                raise ValueError(f"No transition for {self.current_state} on '{symbol}'")
-            
+                if trap_flags[state_id]:
+                    compiled.output(state_id)
+                out[count] = outputs[state_id]
+            count += 1
+        return count
+
+    def calculate_many(self, inputs: Iterable[Any], errors: Optional[Dict[int, Exception]] = None) -> List[Any]:
+        """
+        Runs calculate on each input in turn and returns the results in order.
+        Stops at the first input that raises, unless errors is given: each failing input's
+        exception is then stored there by position, its result is None and the batch goes on.
+        For classes that set calculate_returns_output, the machine is compiled and its stepper looked
+        up once per batch, and each input is a loop over state IDs instead of a calculate() call.
+        """
+        if self._calculate_is_output():
+            return self._calculate_outputs(inputs, errors)
+        calculate = self.calculate
+        results: List[Any] = []
+        for position, input_data in enumerate(inputs):
+            try:
+                results.append(calculate(input_data))
+            except Exception as exc:
+                if errors is None:
+                    raise
+                errors[position] = exc
+                results.append(None)
+        return results
+
+    def _calculate_is_output(self) -> bool:
+        if "calculate" in vars(self):
+            return False
+        for cls in type(self).__mro__:
+            if "calculate" in vars(cls):
+                return vars(cls).get("calculate_returns_output", False)
+        return False
+
+    def _calculate_outputs(self, inputs: Iterable[Any], errors: Optional[Dict[int, Exception]]) -> List[Any]:
+        if self.output_mapping is None:
+            raise NotImplementedError("Output mapping is not defined for this FSM.")
+        compiled = self.compile()
+        step = compiled.stepper(self.engine)
+        split = self.splitter.split
+        output = compiled.output
+        initial_id = compiled.index[self.initial_state]
+        walk = self._walk
+        results: List[Any] = []
+        for position, input_data in enumerate(inputs):
+            try:
+                results.append(output(walk(compiled, step, initial_id, split(input_data))))
+            except Exception as exc:
+                if errors is None:
+                    raise
+                errors[position] = exc
+                results.append(None)
+        return results
+
+    def content_hash(self) -> str:
+        """Returns a hash of the initial state, transition table, output mapping and splitter configuration."""
+        return machine_content_hash(self.initial_state, self.transitions, self.output_mapping, self.splitter)
+
+    def footprint(self) -> Dict[str, int]:
+        """
+        Returns the estimated bytes held by each component of this FSM: those of its compiled form
+        (see CompiledMachine.footprint) plus table (the TransitionTable's own lists and change log),
+        output_mapping and splitter. Objects shared between components are counted once.
+        """
+        seen = set()
+        sizes = self.compile().footprint(seen)
+        sizes.update(component_sizes([
+            ("table", (self.transitions,)),
+            ("output_mapping", (self.output_mapping,)),
+            ("splitter", (self.splitter,)),
+        ], seen))
+        return sizes
+
     def get_current_state(self) -> State:
         return self.current_state
 
     def validate(self):
         """Run all FSM validation checks."""
-        errors = []
-        errors.extend(self._check_unreachable_states())
-        errors.extend(self._check_missing_transitions())
-        errors.extend(self._check_ambiguous_transitions())
-        return errors
-
-    def _check_unreachable_states(self):
-        """Return a list of unreachable states."""
-        reachable = set()
-        to_visit = {self.initial_state}
-        while to_visit:
-            state = to_visit.pop()
-            if state in reachable:
-                continue
-            reachable.add(state)
-            for input_token in self.transitions.inputs_for_state(state):
-                next_state = self.transitions.get(state, input_token)
-                if next_state and next_state not in reachable:
-                    to_visit.add(next_state)
-        unreachable = set(self.transitions.states()) - reachable
-        return [f"Unreachable state: {s}" for s in unreachable]
-
-    def _check_missing_transitions(self):
-        """Return a list of missing transitions for each state/input."""
-        errors = []
-        for state in self.transitions.states():
-            for input_token in self.transitions.all_inputs():
-                if not self.transitions.has(state, input_token):
-                    errors.append(f"Missing transition: state={state}, input={input_token}")
-        return errors
-
-    def _check_ambiguous_transitions(self):
-        """Return a list of ambiguous transitions (multiple for same state/input)."""
-        errors = []
-        for state in self.transitions.states():
-            for input_token in self.transitions.all_inputs():
-                if self.transitions.count(state, input_token) > 1:
-                    errors.append(f"Ambiguous transition: state={state}, input={input_token}")
-        return errors
\ No newline at end of file
+        return self.validation_report().errors()
+
+    def validation_report(self) -> ValidationReport:
+        """
+        Return unreachable and dead states, missing and ambiguous transitions as a structured report.
+        An up-to-date compiled form is reused; otherwise the table is validated directly, since
+        validation needs none of the structures compile() builds for stepping.
+        """
+        compiled = self._compiled
+        if compiled is not None and not compiled.live_outputs \
+                and compiled.is_current(self.transitions, self.output_mapping, self.initial_state):
+            return validate_compiled(compiled, compiled.index[self.initial_state])
+        return validate_table(self.initial_state, self.transitions, self.output_mapping)
+
+
+def _no_transition(compiled: CompiledMachine, state_id: int, symbol: Any) -> ValueError:
+    return ValueError(f"No transition for {compiled.states[state_id]} on '{symbol}'")
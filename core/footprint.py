@@ -0,0 +1,49 @@
+import gc
+import sys
+from types import BuiltinFunctionType, FunctionType, ModuleType
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+# Shared by every machine (classes, code, singletons): never attributed to one.
+_SHARED_TYPES = (type, ModuleType, FunctionType, BuiltinFunctionType)
+_SINGLETON_IDS = frozenset(map(id, (None, True, False, Ellipsis, NotImplemented)))
+
+
+def deep_sizeof(obj: Any, seen: Optional[Set[int]] = None) -> int:
+    """
+    Return the bytes held by obj and everything it references, each object counted once per
+    seen set. Unlike sys.getsizeof it follows containers, instance attributes (__dict__ and
+    __slots__), bound methods and compiled regexes (their pattern string and group index), using
+    gc.get_referents so measuring does not materialize instance dicts.
+    Classes, functions, modules and singletons are shared by all machines and count as 0.
+    On CPython 3.11+ attribute values kept inline in an instance are not part of sys.getsizeof,
+    so plain instances come out a few pointers (about 40 bytes for a TransitionRule) too small.
+    """
+    if seen is None:
+        seen = set()
+    total = 0
+    pending = [obj]
+    while pending:
+        item = pending.pop()
+        if id(item) in seen or id(item) in _SINGLETON_IDS or isinstance(item, _SHARED_TYPES):
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            # Dicts with only str keys do not report their keys as referents.
+            pending.extend(item.keys())
+            pending.extend(item.values())
+        else:
+            # Instance attributes, slots, bound methods and regex pattern/group index, without
+            # creating the lazily built __dict__ of instances.
+            pending.extend(gc.get_referents(item))
+    return total
+
+
+def component_sizes(components: Iterable[Tuple[str, Tuple[Any, ...]]], seen: Optional[Set[int]] = None) -> Dict[str, int]:
+    """
+    Measure (name, roots) components in order with one seen set, so an object reachable from
+    several components is attributed to the first. Returns {name: bytes}.
+    """
+    if seen is None:
+        seen = set()
+    return {name: sum(deep_sizeof(root, seen) for root in roots) for name, roots in components}
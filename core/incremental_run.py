@@ -0,0 +1,223 @@
+import random
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.finite_state_machine import FiniteStateMachine
+from core.state import State
+from core.types.output_type import OutputType
+
+# A transition function over state IDs: func[state_id] is the state after the segment.
+# Index len(states) is a sink for "no transition", which maps to itself.
+Function = Tuple[int, ...]
+
+
+class _Node:
+    __slots__ = ("symbol", "func", "priority", "left", "right", "size", "agg")
+
+    def __init__(self, symbol: Any, func: Function, priority: float):
+        self.symbol = symbol
+        self.func = func
+        self.priority = priority
+        self.left: Optional["_Node"] = None
+        self.right: Optional["_Node"] = None
+        self.size = 1
+        self.agg = func
+
+
+class IncrementalRun:
+    def __init__(self, machine: FiniteStateMachine, input_data: Any = ""):
+        """
+        Keeps the input of a run in a balanced tree (a treap keyed by position) where every node
+        stores the composed state-to-state transition function of its subtree. Replacing,
+        inserting or deleting a symbol recomputes only the O(log n) functions on its path, each in
+        O(number of states), and the final state or the state after any prefix is read back in
+        O(log n). The machine's splitter tokenizes input_data; edits take single symbols.
+        """
+        self.machine = machine
+        self.compiled = machine.compile()
+        self._sink = len(self.compiled.states)
+        self._functions: Dict[Any, Function] = {}
+        self._random = random.Random(0)
+        self._root = self._build(list(machine.splitter.split(input_data)))
+
+    def __len__(self) -> int:
+        return self._size(self._root)
+
+    def symbols(self) -> List[Any]:
+        """Return the current input symbols, in order."""
+        result: List[Any] = []
+        stack: List[_Node] = []
+        node = self._root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            result.append(node.symbol)
+            node = node.right
+        return result
+
+    def replace(self, position: int, symbol: Any) -> None:
+        """Replace the symbol at position."""
+        self._check_position(position, len(self) - 1)
+        left, rest = self._split(self._root, position)
+        node, right = self._split(rest, 1)
+        node.symbol = symbol
+        node.func = node.agg = self._function(symbol)
+        self._root = self._merge(self._merge(left, node), right)
+
+    def insert(self, position: int, symbol: Any) -> None:
+        """Insert symbol before position (position == len(self) appends)."""
+        self._check_position(position, len(self))
+        left, right = self._split(self._root, position)
+        node = _Node(symbol, self._function(symbol), self._random.random())
+        self._root = self._merge(self._merge(left, node), right)
+
+    def delete(self, position: int) -> None:
+        """Delete the symbol at position."""
+        self._check_position(position, len(self) - 1)
+        left, rest = self._split(self._root, position)
+        _, right = self._split(rest, 1)
+        self._root = self._merge(left, right)
+
+    def state_at(self, prefix_length: int) -> State:
+        """Return the state after the first prefix_length symbols."""
+        self._check_position(prefix_length, len(self))
+        initial = self.compiled.index[self.machine.initial_state]
+        return self._state(self._state_id_at(prefix_length, initial), prefix_length)
+
+    def final_state(self) -> State:
+        """Return the state after the whole input."""
+        state_id = self.compiled.index[self.machine.initial_state]
+        if self._root is not None:
+            state_id = self._root.agg[state_id]
+        return self._state(state_id, len(self))
+
+    def output(self) -> OutputType:
+        """Return the output of the final state, like process() followed by get_output()."""
+        return self.compiled.output(self.compiled.index[self.final_state()])
+
+    def _state(self, state_id: int, prefix_length: int) -> State:
+        if state_id == self._sink:
+            position = self._first_stuck(prefix_length)
+            raise ValueError(f"No transition for {self.state_at(position)} on '{self._symbol_at(position)}'")
+        return self.compiled.states[state_id]
+
+    def _first_stuck(self, prefix_length: int) -> int:
+        # Binary search for the last prefix that still has a state.
+        low, high = 0, prefix_length - 1
+        initial = self.compiled.index[self.machine.initial_state]
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self._state_id_at(middle, initial) == self._sink:
+                high = middle - 1
+            else:
+                low = middle
+        return low
+
+    def _state_id_at(self, prefix_length: int, state_id: int) -> int:
+        node = self._root
+        remaining = prefix_length
+        while node is not None and remaining:
+            left_size = self._size(node.left)
+            if remaining <= left_size:
+                node = node.left
+                continue
+            if node.left is not None:
+                state_id = node.left.agg[state_id]
+            state_id = node.func[state_id]
+            remaining -= left_size + 1
+            node = node.right
+        return state_id
+
+    def _symbol_at(self, position: int) -> Any:
+        node = self._root
+        while True:
+            left_size = self._size(node.left)
+            if position < left_size:
+                node = node.left
+            elif position == left_size:
+                return node.symbol
+            else:
+                position -= left_size + 1
+                node = node.right
+
+    def _function(self, symbol: Any) -> Function:
+        try:
+            return self._functions[symbol]
+        except KeyError:
+            pass
+        except TypeError:
+            return self._leaf_function(symbol)
+        func = self._functions[symbol] = self._leaf_function(symbol)
+        return func
+
+    def _leaf_function(self, symbol: Any) -> Function:
+        step, sink = self.compiled.step, self._sink
+        targets = [step(state_id, symbol) for state_id in range(sink)]
+        return tuple(target if target >= 0 else sink for target in targets) + (sink,)
+
+    @staticmethod
+    def _size(node: Optional[_Node]) -> int:
+        return node.size if node is not None else 0
+
+    def _update(self, node: _Node) -> _Node:
+        agg = node.func
+        size = 1
+        if node.left is not None:
+            agg = tuple(map(agg.__getitem__, node.left.agg))
+            size += node.left.size
+        if node.right is not None:
+            agg = tuple(map(node.right.agg.__getitem__, agg))
+            size += node.right.size
+        node.agg = agg
+        node.size = size
+        return node
+
+    def _split(self, node: Optional[_Node], count: int) -> Tuple[Optional[_Node], Optional[_Node]]:
+        """Split into the first count symbols and the rest."""
+        if node is None:
+            return None, None
+        left_size = self._size(node.left)
+        if count <= left_size:
+            left, node.left = self._split(node.left, count)
+            return left, self._update(node)
+        node.right, right = self._split(node.right, count - left_size - 1)
+        return self._update(node), right
+
+    def _merge(self, left: Optional[_Node], right: Optional[_Node]) -> Optional[_Node]:
+        if left is None:
+            return right
+        if right is None:
+            return left
+        if left.priority > right.priority:
+            left.right = self._merge(left.right, right)
+            return self._update(left)
+        right.left = self._merge(left, right.left)
+        return self._update(right)
+
+    def _build(self, symbols: List[Any]) -> Optional[_Node]:
+        # Cartesian tree over random priorities in O(n), then aggregates bottom-up.
+        stack: List[_Node] = []
+        for symbol in symbols:
+            node = _Node(symbol, self._function(symbol), self._random.random())
+            last = None
+            while stack and stack[-1].priority < node.priority:
+                last = stack.pop()
+            node.left = last
+            if stack:
+                stack[-1].right = node
+            stack.append(node)
+        root = stack[0] if stack else None
+        order: List[_Node] = []
+        pending = [root] if root is not None else []
+        while pending:
+            node = pending.pop()
+            order.append(node)
+            pending.extend(child for child in (node.left, node.right) if child is not None)
+        for node in reversed(order):
+            self._update(node)
+        return root
+
+    def _check_position(self, position: int, upper: int) -> None:
+        if not 0 <= position <= upper:
+            raise IndexError(f"Position {position} out of range 0..{upper}")
@@ -0,0 +1,177 @@
+import re
+from bisect import bisect_right
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import re._parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+from core.state import State
+from core.transition_rule import TransitionRule
+from core.types.input_type import CharRange
+
+MAX_CODEPOINT = 0x10FFFF
+Ranges = List[Tuple[int, int]]
+
+_LITERAL = sre_parse.LITERAL
+_NOT_LITERAL = sre_parse.NOT_LITERAL
+_IN = sre_parse.IN
+_ANY = sre_parse.ANY
+_RANGE = sre_parse.RANGE
+_NEGATE = sre_parse.NEGATE
+_BRANCH = sre_parse.BRANCH
+_SUBPATTERN = sre_parse.SUBPATTERN
+_AT = sre_parse.AT
+_REPEATS = tuple(
+    getattr(sre_parse, name) for name in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT") if hasattr(sre_parse, name)
+)
+_ANCHORS_BEGIN = (sre_parse.AT_BEGINNING, sre_parse.AT_BEGINNING_STRING)
+_ANCHORS_END = (sre_parse.AT_END, sre_parse.AT_END_STRING)
+
+
+def regex_to_ranges(pattern: re.Pattern) -> Optional[Ranges]:
+    """
+    Return the codepoint ranges of the single characters `pattern.match` accepts, or None if the
+    pattern is not a plain character class. Handles literals, `.`, `[...]` / `[^...]` sets with
+    literals and ranges, alternations of those, groups, optional `^`/`$` anchors and repeats with
+    a minimum of at least one (`[a-z]+` accepts the same single characters as `[a-z]`, while
+    `[a-z]{2}` accepts none).
+    Patterns with flags such as IGNORECASE, or with categories like `\\d`, are left alone.
+    """
+    if not isinstance(pattern.pattern, str) or pattern.flags & ~re.UNICODE:
+        return None
+    try:
+        items = list(sre_parse.parse(pattern.pattern, pattern.flags))
+    except re.error:
+        return None
+    while items and items[0][0] is _AT and items[0][1] in _ANCHORS_BEGIN:
+        items.pop(0)
+    while items and items[-1][0] is _AT and items[-1][1] in _ANCHORS_END:
+        items.pop()
+    if len(items) != 1:
+        return None
+    return _item_ranges(*items[0])
+
+
+def _item_ranges(op, arg) -> Optional[Ranges]:
+    if op is _LITERAL:
+        return [(arg, arg)]
+    if op is _NOT_LITERAL:
+        return _complement([(arg, arg)])
+    if op is _ANY:
+        return _complement([(ord("\n"), ord("\n"))])
+    if op is _IN:
+        negate = bool(arg) and arg[0][0] is _NEGATE
+        ranges = []
+        for item_op, item_arg in arg[1:] if negate else arg:
+            if item_op is _LITERAL:
+                ranges.append((item_arg, item_arg))
+            elif item_op is _RANGE:
+                ranges.append(item_arg)
+            else:
+                return None
+        ranges = _normalize(ranges)
+        return _complement(ranges) if negate else ranges
+    if op is _BRANCH:
+        ranges = []
+        for branch in arg[1]:
+            branch = list(branch)
+            if len(branch) != 1:
+                return None
+            branch_ranges = _item_ranges(*branch[0])
+            if branch_ranges is None:
+                return None
+            ranges.extend(branch_ranges)
+        return _normalize(ranges)
+    if op is _SUBPATTERN:
+        _, add_flags, del_flags, body = arg
+        body = list(body)
+        if add_flags or del_flags or len(body) != 1:
+            return None
+        return _item_ranges(*body[0])
+    if op in _REPEATS:
+        low, _, body = arg
+        body = list(body)
+        if low < 1 or len(body) != 1:
+            return None
+        ranges = _item_ranges(*body[0])
+        # The body consumes one character per repeat, so a single character cannot satisfy low > 1.
+        return [] if ranges is not None and low > 1 else ranges
+    return None
+
+
+def _normalize(ranges: Ranges) -> Ranges:
+    merged: Ranges = []
+    for low, high in sorted(ranges):
+        if merged and low <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], high))
+        else:
+            merged.append((low, high))
+    return merged
+
+
+def _complement(ranges: Ranges) -> Ranges:
+    result: Ranges = []
+    start = 0
+    for low, high in _normalize(ranges):
+        if low > start:
+            result.append((start, low - 1))
+        start = high + 1
+    if start <= MAX_CODEPOINT:
+        result.append((start, MAX_CODEPOINT))
+    return result
+
+
+def matcher_ranges(matcher) -> Optional[Ranges]:
+    """
+    Return the codepoint ranges of the single-character symbols matcher accepts, [] if it can
+    never match a single character, or None if that cannot be decided statically.
+    """
+    if isinstance(matcher, CharRange):
+        return [(ord(matcher.first), ord(matcher.last))]
+    if isinstance(matcher, re.Pattern):
+        return regex_to_ranges(matcher)
+    if isinstance(matcher, str):
+        return [(ord(matcher), ord(matcher))] if len(matcher) == 1 else []
+    if isinstance(matcher, (int, bool)):
+        return []
+    return None
+
+
+class IntervalIndex:
+    def __init__(self, starts: List[int], targets: List[int]):
+        """
+        Sorted interval boundaries of one state: codepoints from starts[i] up to starts[i + 1] - 1
+        go to targets[i] (-1 for no transition). Lookup is a bisect.
+        """
+        self.starts = starts
+        self.targets = targets
+
+    @classmethod
+    def for_rules(cls, rules: List[TransitionRule], index: Dict[State, int]) -> Optional["IntervalIndex"]:
+        """
+        Build the index for one state's rules, or None if some rule's single-character behaviour
+        cannot be expressed as ranges. Earlier rules take precedence where ranges overlap.
+        """
+        painted: List[Tuple[int, int, int]] = []
+        for rule in rules:
+            ranges = matcher_ranges(rule.input_matcher)
+            if ranges is None:
+                return None
+            painted.extend((low, high, index[rule.to_state]) for low, high in ranges)
+        cuts = sorted({0, MAX_CODEPOINT + 1}.union(*[(low, high + 1) for low, high, _ in painted]))
+        segment_targets = [-1] * (len(cuts) - 1)
+        for low, high, target in reversed(painted):
+            for segment in range(bisect_right(cuts, low) - 1, bisect_right(cuts, high)):
+                segment_targets[segment] = target
+        starts: List[int] = []
+        targets: List[int] = []
+        for start, target in zip(cuts, segment_targets):
+            if not targets or targets[-1] != target:
+                starts.append(start)
+                targets.append(target)
+        return cls(starts, targets)
+
+    def lookup(self, codepoint: int) -> int:
+        return self.targets[bisect_right(self.starts, codepoint) - 1]
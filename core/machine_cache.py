@@ -0,0 +1,173 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Union
+
+from core.compiled_machine import CompiledMachine
+from core.finite_state_machine import FiniteStateMachine
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class _Entry:
+    __slots__ = ("compiled", "size", "compile_seconds", "pins")
+
+    def __init__(self, compiled: CompiledMachine, size: int, compile_seconds: float):
+        self.compiled = compiled
+        self.size = size
+        self.compile_seconds = compile_seconds
+        self.pins = 0
+
+
+class MachineCache:
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Shares compiled machines between FiniteStateMachine instances with identical definitions,
+        keyed by content_hash() (initial state, rules, outputs and splitter settings).
+        Entries are sized with footprint() and the least recently used unpinned ones are evicted
+        once the total exceeds max_bytes; pinned entries are never evicted. A definition larger than
+        max_bytes on its own is compiled but not kept. Safe to use from several threads.
+        """
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.compile_seconds = 0.0
+        self.compile_seconds_saved = 0.0
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Union[str, FiniteStateMachine]) -> bool:
+        return self._key(key) in self._entries
+
+    def acquire(self, machine: FiniteStateMachine) -> CompiledMachine:
+        """
+        Point machine at the shared compiled form of its definition, compiling and caching it on a
+        miss, and reset the machine to its initial state. Returns the machine's compiled form.
+        Live rule updates on the machine afterwards patch its own copy (copy-on-write); the shared
+        entry is unaffected.
+        """
+        return self._bind(machine, self._entry(machine.content_hash(), machine))
+
+    def pin(self, machine: FiniteStateMachine) -> CompiledMachine:
+        """Acquire machine's compiled form and keep it from being evicted until unpin() is called as often."""
+        key = machine.content_hash()
+        entry = self._entry(key, machine)
+        with self._lock:
+            if self._entries.get(key) is not entry:
+                raise ValueError(f"Machine needs more than max_bytes={self.max_bytes} and cannot be pinned")
+            entry.pins += 1
+        return self._bind(machine, entry)
+
+    def unpin(self, key: Union[str, FiniteStateMachine]) -> None:
+        """Undo one pin() of a machine or content hash; raises KeyError if it is not pinned."""
+        key = self._key(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not entry.pins:
+                raise KeyError(f"Machine {key} is not pinned")
+            entry.pins -= 1
+            self._evict()
+
+    def discard(self, key: Union[str, FiniteStateMachine]) -> None:
+        """Drop an entry, pinned or not. Machines already using it keep their compiled form."""
+        key = self._key(key)
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.bytes -= entry.size
+
+    def clear(self) -> None:
+        """Drop every entry; the counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """Return the cache metrics: hit rate, entries, bytes, evictions and compile seconds spent and saved."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "pinned": sum(1 for entry in self._entries.values() if entry.pins),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "compile_seconds": self.compile_seconds,
+                "compile_seconds_saved": self.compile_seconds_saved,
+            }
+
+    def _entry(self, key: str, machine: FiniteStateMachine) -> _Entry:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self.compile_seconds_saved += entry.compile_seconds
+                return entry
+        # Compile outside the lock so other tenants' hits are not blocked; a concurrent miss on
+        # the same key keeps whichever entry was stored first.
+        started = time.perf_counter()
+        compiled = CompiledMachine(machine.initial_state, machine.transitions, machine.output_mapping)
+        elapsed = time.perf_counter() - started
+        size = sum(compiled.footprint().values())
+        with self._lock:
+            self.misses += 1
+            self.compile_seconds += elapsed
+            existing = self._entries.get(key)
+            if existing is not None:
+                self._entries.move_to_end(key)
+                return existing
+            entry = _Entry(compiled, size, elapsed)
+            if size <= self.max_bytes:
+                self._entries[key] = entry
+                self.bytes += size
+                self._evict()
+            return entry
+
+    @staticmethod
+    def _bind(machine: FiniteStateMachine, entry: _Entry) -> CompiledMachine:
+        machine._compiled = entry.compiled.bound_to(machine.transitions, machine.output_mapping)
+        machine.reset()
+        return machine._compiled
+
+    def _evict(self) -> None:
+        if self.bytes <= self.max_bytes:
+            return
+        for key in [key for key, entry in self._entries.items() if not entry.pins]:
+            entry = self._entries.pop(key)
+            self.bytes -= entry.size
+            self.evictions += 1
+            if self.bytes <= self.max_bytes:
+                return
+
+    @staticmethod
+    def _key(key: Union[str, FiniteStateMachine]) -> str:
+        return key if isinstance(key, str) else key.content_hash()
+
+
+_default_cache: Optional[MachineCache] = None
+_default_lock = threading.Lock()
+
+
+def default_cache() -> MachineCache:
+    """Return the process-wide cache, created with DEFAULT_MAX_BYTES on first use."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = MachineCache()
+        return _default_cache
+
+
+def acquire(machine: FiniteStateMachine) -> CompiledMachine:
+    """Point machine at its shared compiled form in the process-wide cache (see MachineCache.acquire)."""
+    return default_cache().acquire(machine)
@@ -1,13 +1,46 @@
-from typing import Dict, Any
+from collections.abc import MutableMapping
+from typing import Dict, Any, Iterator, Mapping
 from core.state import State
 from core.types.output_type import OutputType
 
-class OutputMapping:
+class OutputMapping(MutableMapping):
     def __init__(self):
         """
         Initializes an empty mapping of states to outputs.
+        Supports the full dict-style (MutableMapping) interface; every change bumps the version.
         """
         self._mapping: Dict[State, OutputType] = {}
+        self._version = 0
+        self._shared = False
+        # True when _mapping is a caller's dict (see from_dict), which can change without a version bump.
+        self._aliased = False
+
+    def copy(self) -> "OutputMapping":
+        """
+        Returns a mapping with the same outputs and version that shares this one's storage until
+        either of them changes (copy-on-write). A mapping aliasing a caller's dict is copied at once,
+        since that dict can change behind both.
+        """
+        clone = OutputMapping()
+        clone._version = self._version
+        if self._aliased:
+            clone._mapping = dict(self._mapping)
+        else:
+            clone._mapping = self._mapping
+            self._shared = clone._shared = True
+        return clone
+
+    @classmethod
+    def from_dict(cls, mapping: Mapping[State, OutputType]) -> "OutputMapping":
+        """
+        Wraps a plain dict of states to outputs without copying it: changes made through either
+        are seen by both. Changes made to the dict directly do not bump the version, so compiled
+        machines read the outputs of such a mapping live (see CompiledMachine.live_outputs).
+        """
+        output_mapping = cls()
+        output_mapping._mapping = mapping
+        output_mapping._aliased = True
+        return output_mapping
 
     def add(self, state: State, output: OutputType):
         """
@@ -16,16 +49,55 @@ class OutputMapping:
         """
         if not isinstance(state, State):
             raise TypeError("Expected state to be of type 'State'")
+        if self._shared:
+            self._mapping = dict(self._mapping)
+            self._shared = False
         self._mapping[state] = output
+        self._version += 1
         return self
 
-    def get(self, state: State) -> OutputType:
+    def get(self, state: State, default: Any = None) -> OutputType:
         """
-        Retrieves the output for a given state. If the state is not found, returns None.
+        Retrieves the output for a given state. If the state is not found, returns default.
         """
         if not isinstance(state, State):
             raise TypeError("Expected state to be of type 'State'")
-        return self._mapping.get(state)
+        return self._mapping.get(state, default)
+
+    def items(self):
+        """
+        Returns the (state, output) pairs of the mapping, like dict.items().
+        """
+        return self._mapping.items()
+
+    def keys(self):
+        return self._mapping.keys()
+
+    def values(self):
+        return self._mapping.values()
+
+    def __getitem__(self, state: State) -> OutputType:
+        return self._mapping[state]
+
+    def __setitem__(self, state: State, output: OutputType) -> None:
+        """Same as add(), so dict-style updates also invalidate compiled machines."""
+        self.add(state, output)
+
+    def __delitem__(self, state: State) -> None:
+        if self._shared:
+            self._mapping = dict(self._mapping)
+            self._shared = False
+        del self._mapping[state]
+        self._version += 1
+
+    def __contains__(self, state: State) -> bool:
+        return state in self._mapping
+
+    def __iter__(self) -> Iterator[State]:
+        return iter(self._mapping)
+
+    def __len__(self) -> int:
+        return len(self._mapping)
 
     def __str__(self):
         """
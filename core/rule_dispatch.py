@@ -0,0 +1,100 @@
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.transition_rule import TransitionRule
+from core.types.input_type import CharRange
+
+# Backreferences and conditionals refer to group numbers/names that shift once patterns are merged.
+_GROUP_REFERENCE = re.compile(r"\\[1-9]|\(\?P=|\(\?\(")
+_GROUP_PREFIX = "_fsm_rule"
+# first_special of a state without regex or CharRange rules: every literal wins.
+_NO_SPECIAL = float("inf")
+
+
+class RuleDispatch:
+    def __init__(self,
+                 literals: Dict[Any, Tuple[int, int]],
+                 pattern: Optional[re.Pattern],
+                 groups: Dict[str, Tuple[int, int]],
+                 ranges: List[Tuple[int, CharRange, int]],
+                 first_special: float,
+                 row: list):
+        """
+        Resolves a symbol for one state with one dict probe and at most one regex call.
+        literals maps a literal matcher to (rule position, target ID) of its first rule; pattern is the
+        alternation of all the state's regex rules, one named group per rule in rule order, and
+        groups maps a group name back to (rule position, target ID). CharRange rules are kept in
+        ranges. The earliest matching rule position wins, as in the rule scan.
+        """
+        self.literals = literals
+        self.pattern = pattern
+        self.groups = groups
+        self.ranges = ranges
+        self.first_special = first_special
+        self.row = row
+
+    @classmethod
+    def for_rules(cls, rules: Tuple[TransitionRule, ...], row: list) -> Optional["RuleDispatch"]:
+        """
+        Build the dispatch for one state's rules, whose (matches, target ID) pairs are row,
+        or None if some rule cannot be merged:
+        bytes patterns, patterns compiled with flags, patterns using backreferences, or list matchers.
+        """
+        literals: Dict[Any, Tuple[int, int]] = {}
+        branches: List[str] = []
+        groups: Dict[str, Tuple[int, int]] = {}
+        ranges: List[Tuple[int, CharRange, int]] = []
+        first_special = _NO_SPECIAL
+        for position, rule in enumerate(rules):
+            matcher, target = rule.input_matcher, row[position][1]
+            if isinstance(matcher, (str, int)):
+                # Checked first: literals are by far the most common matchers.
+                literals.setdefault(matcher, (position, target))
+                continue
+            if isinstance(matcher, re.Pattern):
+                if not isinstance(matcher.pattern, str) or matcher.flags != re.UNICODE \
+                        or _GROUP_REFERENCE.search(matcher.pattern):
+                    return None
+                name = f"{_GROUP_PREFIX}{position}"
+                branches.append(f"(?P<{name}>{matcher.pattern})")
+                groups[name] = (position, target)
+            elif isinstance(matcher, CharRange):
+                ranges.append((position, matcher, target))
+            else:
+                return None
+            first_special = min(first_special, position)
+        pattern = None
+        if branches:
+            try:
+                pattern = re.compile("|".join(branches))
+            except re.error:
+                return None
+        return cls(literals, pattern, groups, ranges, first_special, row)
+
+    def resolve(self, symbol: Any) -> int:
+        """Return the target ID of the first rule matching symbol, or -1 if none does."""
+        try:
+            best = self.literals.get(symbol)
+        except TypeError:
+            return self._scan(symbol)
+        if best is not None and best[0] < self.first_special:
+            return best[1]
+        if self.pattern is not None:
+            match = self.pattern.match(str(symbol))
+            if match is not None:
+                candidate = self.groups[match.lastgroup]
+                if best is None or candidate[0] < best[0]:
+                    best = candidate
+        if self.ranges and type(symbol) is str and len(symbol) == 1:
+            for position, char_range, target in self.ranges:
+                if best is not None and position > best[0]:
+                    break
+                if char_range.matches(symbol):
+                    return target
+        return best[1] if best is not None else -1
+
+    def _scan(self, symbol: Any) -> int:
+        for matches, target in self.row:
+            if matches(symbol):
+                return target
+        return -1
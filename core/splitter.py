@@ -1,16 +1,48 @@
-from typing import Any, Iterable
+from typing import Any, Iterable, Optional, Tuple
 import re
 
+try:
+    import re._parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+# Opcodes whose outcome depends on text outside the match: anchors, word boundaries, lookarounds.
+_CONTEXT_OPS = (sre_parse.AT, sre_parse.ASSERT, sre_parse.ASSERT_NOT, sre_parse.GROUPREF_EXISTS)
+_GREEDY_REPEATS = tuple(
+    getattr(sre_parse, name) for name in ("MAX_REPEAT", "POSSESSIVE_REPEAT") if hasattr(sre_parse, name)
+)
+
 class Splitter:
+    # True when feed() emits tokens before the final chunk, so pending stays about one token long.
+    # Splitters that override feed() that way set it; otherwise streams are buffered whole and
+    # run_with_checkpoints refuses them.
+    incremental = False
+
     def split(self, input_data: Any) -> Iterable:
         raise NotImplementedError
 
+    def feed(self, pending: str, chunk: str, final: bool) -> Tuple[Iterable, str]:
+        """
+        Tokenizes streamed text chunk by chunk. pending is the text left over from the previous
+        call (a token that may continue in this chunk). Returns (complete tokens, new pending).
+        Concatenating the tokens of every call, the last with final=True, gives split(whole input).
+        The default keeps everything pending until the final chunk.
+        """
+        if final:
+            return self.split(pending + chunk), ""
+        return [], pending + chunk
+
 class StringSplitter(Splitter):
+    incremental = True
+
     def split(self, input_data: Any) -> Iterable:
         if not isinstance(input_data, str):
             raise TypeError("Input must be a string")
         return input_data
 
+    def feed(self, pending: str, chunk: str, final: bool) -> Tuple[Iterable, str]:
+        return pending + chunk, ""
+
 class ListSplitter(Splitter):
     def split(self, input_data: Any) -> Iterable:
         if not isinstance(input_data, list):
@@ -18,28 +50,117 @@ class ListSplitter(Splitter):
         return input_data
 
 class CommaStringSplitter(Splitter):
+    incremental = True
+
     def split(self, input_data: Any) -> Iterable:
         if not isinstance(input_data, str):
             raise TypeError("Input must be a string")
         return input_data.split(',')
+
+    def feed(self, pending: str, chunk: str, final: bool) -> Tuple[Iterable, str]:
+        tokens = (pending + chunk).split(',')
+        if final:
+            return tokens, ""
+        return tokens, tokens.pop()
     
 class WhitespaceSplitter(Splitter):
+    incremental = True
+
     def split(self, input_data: Any) -> Iterable:
         if not isinstance(input_data, str):
             raise TypeError("Input must be a string")
         return input_data.split()
+
+    def feed(self, pending: str, chunk: str, final: bool) -> Tuple[Iterable, str]:
+        text = pending + chunk
+        tokens = text.split()
+        if final or not tokens or text[-1].isspace():
+            return tokens, ""
+        return tokens, tokens.pop()
     
 class RegexSplitter(Splitter):
     def __init__(self, pattern: str):
+        """
+        Separators that can match the empty string or whose match depends on surrounding text
+        (anchors, \\b, lookarounds) cannot be matched chunk by chunk; feed() buffers the whole
+        stream for them, like the Splitter default.
+        """
         self.pattern = pattern
+        self._span = _separator_span(pattern)
+        self.incremental = self._span is not None
 
     def split(self, input_data: Any) -> Iterable:
         if not isinstance(input_data, str):
             raise TypeError("Input must be a string")
         return re.split(self.pattern, input_data)
 
+    def feed(self, pending: str, chunk: str, final: bool) -> Tuple[Iterable, str]:
+        """
+        Separators touching the end of a non-final chunk are left pending, since more input
+        could extend them, and so are separators of bounded width w starting fewer than w characters
+        before the end (a{1,3} or a(bc)? could match differently with more input).
+        """
+        if not self.incremental:
+            return super().feed(pending, chunk, final)
+        if final:
+            return self.split(pending + chunk), ""
+        text = pending + chunk
+        tokens = []
+        start = 0
+        for match in re.finditer(self.pattern, text):
+            if match.end() >= len(text) or match.start() + self._span > len(text):
+                break
+            tokens.append(text[start:match.start()])
+            tokens.extend(match.groups())
+            start = match.end()
+        return tokens, text[start:]
+
 class WholeStringSplitter(Splitter):
     def split(self, input_data: Any) -> Iterable:
         if not isinstance(input_data, str):
             raise TypeError("Input must be a string")
-        return [input_data]
\ No newline at end of file
+        return [input_data]
+
+
+def _separator_span(pattern: Any) -> Optional[int]:
+    """
+    Return how many characters from its start a separator match needs to be final, 0 if it is final
+    once it ends before the end of the text, or None if the separator cannot be found chunk by chunk.
+    A separator that never matches empty and never looks past its match is final once the text
+    covers its maximum width. An unbounded one is accepted only as a fixed-width prefix followed by
+    a greedy run of single characters: the run has stopped at a character that does not continue it.
+    """
+    if isinstance(pattern, re.Pattern):
+        pattern, flags = pattern.pattern, pattern.flags
+    else:
+        flags = 0
+    if not isinstance(pattern, str):
+        return None
+    parsed = sre_parse.parse(pattern, flags)
+    low, high = parsed.getwidth()
+    if low == 0 or _uses_context(parsed):
+        return None
+    if high < sre_parse.MAXREPEAT:
+        return high
+    return 0 if _ends_in_greedy_run(parsed) else None
+
+
+def _ends_in_greedy_run(parsed: Any) -> bool:
+    if not len(parsed):
+        return False
+    *prefix, (op, arg) = parsed
+    if prefix:
+        low, high = sre_parse.SubPattern(parsed.state, prefix).getwidth()
+        if low != high:
+            return False
+    if op is sre_parse.SUBPATTERN:
+        return _ends_in_greedy_run(arg[3])
+    return op in _GREEDY_REPEATS and arg[2].getwidth() == (1, 1)
+
+
+def _uses_context(value: Any) -> bool:
+    if isinstance(value, sre_parse.SubPattern):
+        return any(op in _CONTEXT_OPS or _uses_context(arg) for op, arg in value)
+    if isinstance(value, (list, tuple)):
+        return any(_uses_context(item) for item in value)
+    return False
@@ -1,7 +1,7 @@
 from typing import Union
 import re
 from .state import State
-from .types.input_type import InputMatcher, ALLOWED_TYPES  # Import allowed types
+from .types.input_type import InputMatcher, ALLOWED_TYPES, CharRange  # Import allowed types
 
 class TransitionRule:
     @property
@@ -27,7 +27,9 @@ class TransitionRule:
             )
         elif isinstance(self.input_matcher, re.Pattern):
             return bool(self.input_matcher.match(str(input_symbol)))
-        elif isinstance(self.input_matcher, tuple(t for t in ALLOWED_TYPES if t is not re.Pattern)):
+        elif isinstance(self.input_matcher, CharRange):
+            return self.input_matcher.matches(input_symbol)
+        elif isinstance(self.input_matcher, tuple(t for t in ALLOWED_TYPES if t not in (re.Pattern, CharRange))):
             return self.input_matcher == input_symbol
         else:
             raise TypeError(f"Unsupported input matcher type: {type(self.input_matcher)}")
@@ -1,15 +1,50 @@
-from typing import Dict, List, Union
+from typing import Dict, Iterator, List, Optional, Set, Union
 from .state import State
 from .transition_rule import TransitionRule
 from .types.input_type import InputMatcher
 
+# How many changed states the table remembers for changes_since().
+CHANGE_LOG_LIMIT = 4096
+
 class TransitionTable:
     def __init__(self):
         """
         Initializes an empty transition table.
         The table is a dictionary where the keys are states and the values are lists of TransitionRule objects.
+        Every change bumps the version and logs the from_state it touched, so compiled machines
+        can patch just the affected rows (see changes_since).
         """
         self._table: Dict[State, List[TransitionRule]] = {}
+        self._version = 0
+        self._changes: List[State] = []
+        self._changes_base = 0
+        # Copy-on-write bookkeeping for copy(): whether _table is shared with another table, and
+        # which rule lists still are after it has been unshared.
+        self._shared = False
+        self._borrowed: Set[State] = set()
+
+    def copy(self) -> "TransitionTable":
+        """
+        Returns a table with the same rules and version that shares this one's storage until either
+        of them changes: the first change copies the state index (O(states) pointers) and each
+        changed state's rule list is copied when first touched, so the other table never sees it.
+        """
+        clone = TransitionTable()
+        clone._table = self._table
+        clone._version = clone._changes_base = self._version
+        self._shared = clone._shared = True
+        return clone
+
+    def _own(self, from_state: State) -> None:
+        # Called before changing from_state's rules.
+        if self._shared:
+            self._table = dict(self._table)
+            self._borrowed = set(self._table)
+            self._shared = False
+        if from_state in self._borrowed:
+            self._borrowed.discard(from_state)
+            if from_state in self._table:
+                self._table[from_state] = list(self._table[from_state])
 
     def add(self, from_state: State, input_matcher: InputMatcher , to_state: State):
         """
@@ -29,13 +64,84 @@ class TransitionTable:
 
     def _add_rule(self, from_state: State, input_matcher: InputMatcher, to_state: State):
         rule = TransitionRule(from_state, input_matcher, to_state)
+        self._own(from_state)
         if from_state not in self._table:
             self._table[from_state] = []
         self._table[from_state].append(rule)
+        self._record_change(from_state)
+
+    def remove(self, from_state: State, input_matcher: InputMatcher, to_state: Optional[State] = None):
+        """
+        Removes the rules of from_state whose matcher equals input_matcher (each matcher, for a list),
+        only those leading to to_state if it is given.
+        Raises ValueError if no rule was removed.
+        """
+        if not isinstance(from_state, State):
+            raise TypeError("Expected from_state to be of type 'State'")
+        matchers = input_matcher if isinstance(input_matcher, list) else [input_matcher]
+        rules = self.get_rules(from_state)
+        kept = [
+            rule for rule in rules
+            if not (_same_matcher(rule.input_matcher, matchers) and (to_state is None or rule.to_state == to_state))
+        ]
+        if len(kept) == len(rules):
+            raise ValueError(f"No transition for {from_state} on '{input_matcher}' to remove")
+        self._own(from_state)
+        if kept:
+            self._table[from_state] = kept
+        else:
+            del self._table[from_state]
+        self._record_change(from_state)
+        return self  # For chaining
+
+    def replace(self, from_state: State, input_matcher: InputMatcher, to_state: State):
+        """
+        Redirects the rules of from_state whose matcher equals input_matcher (each matcher, for a list)
+        to to_state, keeping their position in the rule order.
+        Raises ValueError if there is no such rule.
+        """
+        if not isinstance(from_state, State):
+            raise TypeError("Expected from_state to be of type 'State'")
+        if not isinstance(to_state, State):
+            raise TypeError("Expected to_state to be of type 'State'")
+        matchers = input_matcher if isinstance(input_matcher, list) else [input_matcher]
+        rules = self.get_rules(from_state)
+        replaced = [
+            TransitionRule(from_state, rule.input_matcher, to_state) if _same_matcher(rule.input_matcher, matchers) else rule
+            for rule in rules
+        ]
+        if all(new is old for new, old in zip(replaced, rules)):
+            raise ValueError(f"No transition for {from_state} on '{input_matcher}' to replace")
+        self._own(from_state)
+        self._table[from_state] = replaced
+        self._record_change(from_state)
+        return self  # For chaining
+
+    def _record_change(self, from_state: State):
+        self._version += 1
+        self._changes.append(from_state)
+        if len(self._changes) > CHANGE_LOG_LIMIT:
+            dropped = len(self._changes) // 2
+            del self._changes[:dropped]
+            self._changes_base += dropped
+
+    def changes_since(self, version: int) -> Optional[List[State]]:
+        """
+        Return the from_states whose rules changed after the given version, in order of first change,
+        or None if the change log no longer reaches back that far.
+        """
+        if version < self._changes_base:
+            return None
+        return list(dict.fromkeys(self._changes[version - self._changes_base:]))
 
     def get_rules(self, state: State) -> List[TransitionRule]:
         return self._table.get(state, [])
 
+    def rules(self) -> Iterator[TransitionRule]:
+        """Yield every rule in insertion order, grouped by from_state."""
+        for rules in self._table.values():
+            yield from rules
+
     def states(self):
         """Return a set of all states in the transition table."""
         states = set(self._table.keys())
@@ -78,4 +184,9 @@ class TransitionTable:
         for from_state, rules in self._table.items():
             for rule in rules:
                 lines.append(f"{rule.from_state} --[{rule.input_matcher}]--> {rule.to_state}")
-        return "\n".join(lines)
\ No newline at end of file
+        return "\n".join(lines)
+
+
+def _same_matcher(matcher: InputMatcher, matchers: List[InputMatcher]) -> bool:
+    # type() check keeps 1 and True (equal in Python) apart
+    return any(type(matcher) is type(other) and matcher == other for other in matchers)
@@ -1,5 +1,34 @@
 from typing import Dict, List, Union
 import re
 
-ALLOWED_TYPES = (str, int, bool, re.Pattern)
-InputMatcher = Union[str, int, bool, re.Pattern, list]
\ No newline at end of file
+
+class CharRange:
+    def __init__(self, first: str, last: str):
+        """
+        Matches any single-character symbol between first and last, inclusive.
+        """
+        if not (isinstance(first, str) and isinstance(last, str) and len(first) == 1 and len(last) == 1):
+            raise TypeError("CharRange bounds must be single characters")
+        if first > last:
+            raise ValueError(f"Empty CharRange: '{first}' > '{last}'")
+        self.first = first
+        self.last = last
+
+    def matches(self, symbol) -> bool:
+        return isinstance(symbol, str) and len(symbol) == 1 and self.first <= symbol <= self.last
+
+    def __eq__(self, other):
+        return isinstance(other, CharRange) and (self.first, self.last) == (other.first, other.last)
+
+    def __hash__(self):
+        return hash((CharRange, self.first, self.last))
+
+    def __repr__(self):
+        return f"CharRange({self.first!r}, {self.last!r})"
+
+    def __str__(self):
+        return f"[{self.first}-{self.last}]"
+
+
+ALLOWED_TYPES = (str, int, bool, re.Pattern, CharRange)
+InputMatcher = Union[str, int, bool, re.Pattern, CharRange, list]
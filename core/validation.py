@@ -0,0 +1,139 @@
+from typing import Any, Dict, List, Sequence, Tuple
+
+from core.compiled_machine import CompiledMachine, _is_trap
+from core.state import State
+from core.transition_rule import TransitionRule
+from core.transition_table import TransitionTable
+from core.types.input_type import InputMatcher
+
+
+class ValidationReport:
+    def __init__(self,
+                 unreachable: List[State],
+                 dead: List[State],
+                 missing: List[Tuple[State, InputMatcher]],
+                 ambiguous: List[Tuple[State, InputMatcher]]):
+        """
+        Structured result of validating a machine.
+        unreachable: table states not reachable from the initial state.
+        dead: table states from which no state with a non-exception output can be reached.
+        missing: (state, input) pairs with no transition, over every input used in the table.
+        ambiguous: (state, input) pairs with more than one transition.
+        """
+        self.unreachable = unreachable
+        self.dead = dead
+        self.missing = missing
+        self.ambiguous = ambiguous
+
+    def is_valid(self) -> bool:
+        """Return True if there are no unreachable states, missing or ambiguous transitions."""
+        return not (self.unreachable or self.missing or self.ambiguous)
+
+    def errors(self) -> List[str]:
+        """Return the report as the messages FiniteStateMachine.validate() produces."""
+        errors = [f"Unreachable state: {state}" for state in self.unreachable]
+        errors.extend(f"Missing transition: state={state}, input={token}" for state, token in self.missing)
+        errors.extend(f"Ambiguous transition: state={state}, input={token}" for state, token in self.ambiguous)
+        return errors
+
+
+def validate_compiled(compiled: CompiledMachine, initial_id: int = 0) -> ValidationReport:
+    """Validate an already compiled machine (see _validate)."""
+    return _validate(compiled.states, compiled.index, compiled.rules, compiled.trap_flags, initial_id)
+
+
+def validate_table(initial_state: State, transitions: TransitionTable, output_mapping: Any) -> ValidationReport:
+    """
+    Validate a machine straight from its table, numbering states as CompiledMachine does but
+    without building the interval indexes and rule dispatch that stepping needs, which cost far
+    more than validation itself on large machines.
+    """
+    states: List[State] = [initial_state]
+    index: Dict[State, int] = {initial_state: 0}
+    previous = None
+    for rule in transitions.rules():
+        # Rules come grouped by from_state, so each source only needs interning once.
+        candidates = (rule.to_state,) if rule.from_state is previous else (rule.from_state, rule.to_state)
+        previous = rule.from_state
+        for state in candidates:
+            if state not in index:
+                index[state] = len(states)
+                states.append(state)
+    mapping = dict(output_mapping.items()) if output_mapping is not None else {}
+    trap_flags = bytearray(_is_trap(mapping.get(state)) for state in states) if mapping else bytearray(len(states))
+    rules = [transitions.get_rules(state) for state in states]
+    return _validate(states, index, rules, trap_flags, 0)
+
+
+def _validate(states: List[State],
+              index: Dict[State, int],
+              rules_by_state: List[Sequence[TransitionRule]],
+              trap_flags: bytearray,
+              initial_id: int) -> ValidationReport:
+    """
+    Validate in time linear in the rules (plus the size of the missing list).
+    The rules are read once into per-state adjacency (the first rule for each input, as
+    TransitionTable.get returns it), then reachability and co-reachability are breadth-first
+    searches over state IDs with bytearray visited sets.
+    """
+    count = len(states)
+    in_table = bytearray(count)
+    first: List[Dict[Any, int]] = [{} for _ in range(count)]
+    ambiguous_ids: List[Tuple[int, Any]] = []
+    alphabet: Dict[Any, None] = {}
+    for source, rules in enumerate(rules_by_state):
+        for rule in rules:
+            target = index[rule.to_state]
+            in_table[source] = in_table[target] = 1
+            token = rule.input_matcher
+            alphabet[token] = None
+            targets = first[source]
+            if token in targets:
+                ambiguous_ids.append((source, token))
+            else:
+                targets[token] = target
+
+    successors = [list(set(targets.values())) for targets in first]
+    reachable = _search(successors, [initial_id], count)
+
+    predecessors: List[List[int]] = [[] for _ in range(count)]
+    for source, targets in enumerate(successors):
+        for target in targets:
+            predecessors[target].append(source)
+    live = [state_id for state_id in range(count) if in_table[state_id] and not trap_flags[state_id]]
+    co_reachable = _search(predecessors, live, count)
+
+    missing = []
+    width = len(alphabet)
+    for state_id in range(count):
+        if in_table[state_id] and len(first[state_id]) < width:
+            targets = first[state_id]
+            missing.extend((states[state_id], token) for token in alphabet if token not in targets)
+    seen = set()
+    ambiguous = []
+    for source, token in ambiguous_ids:
+        if (source, token) not in seen:
+            seen.add((source, token))
+            ambiguous.append((states[source], token))
+
+    return ValidationReport(
+        unreachable=[states[i] for i in range(count) if in_table[i] and not reachable[i]],
+        dead=[states[i] for i in range(count) if in_table[i] and not co_reachable[i]],
+        missing=missing,
+        ambiguous=ambiguous,
+    )
+
+
+def _search(graph: List[List[int]], sources: List[int], count: int) -> bytearray:
+    visited = bytearray(count)
+    queue = []
+    for source in sources:
+        if not visited[source]:
+            visited[source] = 1
+            queue.append(source)
+    for state_id in queue:
+        for next_id in graph[state_id]:
+            if not visited[next_id]:
+                visited[next_id] = 1
+                queue.append(next_id)
+    return visited
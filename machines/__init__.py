@@ -1 +1,3 @@
 # This file marks the 'machines' directory as a Python package.
+# Machine modules are loaded lazily through the registry; see machines/registry.py.
+from machines.registry import available_machines, get_machine, machine_timings
@@ -7,6 +7,8 @@ class ParityCheckerMachine(FiniteStateMachine):
     FSM that checks the parity (even or odd number of 1s) in a binary string.
     Output: 0 for even parity, 1 for odd parity.
     """
+    calculate_returns_output = True
+
     def __init__(self):
         even = State('EVEN')
         odd = State('ODD')
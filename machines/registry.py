@@ -0,0 +1,75 @@
+import copy
+import importlib
+import pkgutil
+import threading
+import time
+from typing import Dict, List
+
+_PACKAGE = __name__.rpartition(".")[0]
+_SUFFIX = "_machine"
+
+_lock = threading.Lock()
+_prototypes: Dict[str, object] = {}
+_timings: Dict[str, Dict[str, float]] = {}
+
+
+def available_machines() -> List[str]:
+    """
+    Return the names of the bundled machines without importing them:
+    every `<name>_machine.py` module in this package is registered as `<name>`.
+    """
+    package = importlib.import_module(_PACKAGE)
+    return sorted(
+        module.name[:-len(_SUFFIX)]
+        for module in pkgutil.iter_modules(package.__path__)
+        if module.name.endswith(_SUFFIX)
+    )
+
+
+def get_machine(name: str):
+    """
+    Return a run handle for the named machine, e.g. get_machine("mod_three").
+    The machine's module is imported and its definition built and compiled once per process.
+    Each handle has its own current state and copy-on-write copies of the prototype's transition
+    table and output mapping, bound to the prototype's compiled form: creating one copies no rules,
+    and live updates on a handle (see TransitionTable.replace) only affect that handle.
+    """
+    prototype = _prototypes.get(name)
+    if prototype is None:
+        prototype = _build(name)
+    handle = copy.copy(prototype)
+    handle.transitions = prototype.transitions.copy()
+    handle.output_mapping = prototype.output_mapping.copy()
+    handle._compiled = prototype.compile().bound_to(handle.transitions, handle.output_mapping)
+    handle.reset()
+    return handle
+
+
+def machine_timings() -> Dict[str, Dict[str, float]]:
+    """Return the import and build (construction plus compile) seconds of each machine loaded so far."""
+    return {name: dict(timing) for name, timing in _timings.items()}
+
+
+def _build(name: str):
+    with _lock:
+        if name in _prototypes:
+            return _prototypes[name]
+        if name not in available_machines():
+            raise KeyError(f"Unknown machine '{name}'")
+        from core.finite_state_machine import FiniteStateMachine
+
+        started = time.perf_counter()
+        module = importlib.import_module(f"{_PACKAGE}.{name}{_SUFFIX}")
+        imported = time.perf_counter()
+        classes = [
+            value for value in vars(module).values()
+            if isinstance(value, type) and issubclass(value, FiniteStateMachine) and value.__module__ == module.__name__
+        ]
+        if len(classes) != 1:
+            raise LookupError(f"Expected one machine class in {module.__name__}, found {len(classes)}")
+        prototype = classes[0]()
+        prototype.compile()
+        built = time.perf_counter()
+        _timings[name] = {"import_seconds": imported - started, "build_seconds": built - imported}
+        _prototypes[name] = prototype
+        return prototype
@@ -4,6 +4,8 @@ from core.finite_state_machine import FiniteStateMachine
 
 
 class TrapStateMachine(FiniteStateMachine):
+    calculate_returns_output = True
+
     def __init__(self):
         s0 = State('S0')
         s1 = State('S1')
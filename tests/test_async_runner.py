@@ -0,0 +1,66 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import asyncio
+import pytest
+from core.async_runner import AsyncMachineRunner
+from machines.mod_three_machine import ModThreeMachine
+
+def test_async_runner_concurrent_calls_are_batched():
+    """Test that concurrent calls are answered correctly and grouped into micro-batches."""
+    inputs = [bin(i)[2:] for i in range(100)]
+
+    async def main():
+        async with AsyncMachineRunner(ModThreeMachine(), max_batch_size=32, max_wait=0.01) as runner:
+            results = await asyncio.gather(*(runner.calculate(x) for x in inputs))
+        return results, runner
+
+    results, runner = asyncio.run(main())
+    assert results == [i % 3 for i in range(100)]
+    assert runner.items == 100
+    assert runner.batches == 4
+
+def test_async_runner_error_fails_only_its_request():
+    """Test that an invalid input raises for its caller while the rest of the batch succeeds."""
+    async def main():
+        async with AsyncMachineRunner(ModThreeMachine(), max_wait=0.01) as runner:
+            return await asyncio.gather(
+                runner.calculate("11"), runner.calculate("1a"), runner.calculate("100"),
+                return_exceptions=True,
+            )
+
+    ok_first, error, ok_last = asyncio.run(main())
+    assert ok_first == 0 and ok_last == 1
+    assert isinstance(error, ValueError) and "No transition" in str(error)
+
+def test_async_runner_stream():
+    """Test that calculate_stream yields results of an async iterator in order."""
+    async def source():
+        for i in range(50):
+            yield bin(i)[2:]
+
+    async def main():
+        async with AsyncMachineRunner(ModThreeMachine(), max_batch_size=8) as runner:
+            return [result async for result in runner.calculate_stream(source())]
+
+    assert asyncio.run(main()) == [i % 3 for i in range(50)]
+
+def test_async_runner_rejects_bad_batch_size():
+    """Test that max_batch_size must be positive."""
+    with pytest.raises(ValueError):
+        AsyncMachineRunner(ModThreeMachine(), max_batch_size=0)
+
+def test_async_runner_runs_failing_batch_once():
+    """Test that a batch with a bad input is run once, each input split a single time."""
+    machine = ModThreeMachine()
+    seen = []
+    split = machine.splitter.split
+    machine.splitter.split = lambda input_data: seen.append(input_data) or split(input_data)
+
+    async def main():
+        async with AsyncMachineRunner(machine, max_wait=0.01) as runner:
+            return await asyncio.gather(*(runner.calculate(x) for x in ["11", "1a", "100"]), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert results[0] == 0 and isinstance(results[1], ValueError) and results[2] == 1
+    assert seen == ["11", "1a", "100"]
@@ -0,0 +1,102 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pickle
+import re
+import pytest
+from core.state import State
+from core.output_mapping import OutputMapping
+from core.transition_table import TransitionTable
+from core.finite_state_machine import FiniteStateMachine
+from core.compiled_machine import ENGINES
+from core.types.input_type import CharRange
+import core.autotune as autotune_module
+from core.autotune import autotune
+from machines.mod_three_machine import ModThreeMachine
+
+SAMPLES = ["1011", "0", "111111", "10" * 50]
+
+class MyFSM(FiniteStateMachine):
+    def calculate(self, input_symbol):
+        self.process(input_symbol)
+        return self.get_output()
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_every_engine_gives_the_same_results(engine):
+    """Test that each engine computes the same outputs and reports missing transitions alike."""
+    machine = ModThreeMachine()
+    machine.engine = engine
+    for sample in SAMPLES:
+        assert machine.calculate(sample) == int(sample, 2) % 3
+    with pytest.raises(ValueError):
+        machine.calculate("102")
+
+def test_dense_engine_falls_back_after_non_literal_update():
+    """Test that a live update adding a range rule keeps a dense-engine machine running."""
+    machine = ModThreeMachine()
+    machine.engine = "dense"
+    assert machine.calculate("1011") == 2
+    machine.transitions.add(State("S0"), CharRange("2", "9"), State("S0"))
+    assert machine.calculate("1011") == 2
+    assert machine.calculate("21") == 1
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_machine_pickles_after_running_on_engine(engine):
+    """Test that cached steppers do not stop a machine from being sent to worker processes."""
+    machine = ModThreeMachine()
+    machine.engine = engine
+    machine.calculate("1011")
+    copy = pickle.loads(pickle.dumps(machine))
+    assert copy.calculate("110") == 0
+
+def test_autotune_picks_a_benchmarked_engine():
+    """Test that autotune times every applicable engine and sets the fastest on the machine."""
+    machine = ModThreeMachine()
+    result = autotune(machine, SAMPLES, repeat=1)
+    assert set(result.seconds) == set(ENGINES)
+    assert result.engine == min(result.seconds, key=result.seconds.get) == machine.engine
+    assert machine.calculate("1011") == 2
+
+def test_autotune_respects_memory_limit_and_unsupported_engines():
+    """Test that engines over the memory limit or unable to run the table are skipped."""
+    machine = ModThreeMachine()
+    sizes = autotune(machine, SAMPLES, repeat=1).bytes
+    assert sizes["dense"] > sizes["step"]
+    result = autotune(machine, SAMPLES, memory_limit=sizes["dense"] - 1, repeat=1)
+    assert "dense" in result.skipped and result.engine == machine.engine != "dense"
+    fresh = ModThreeMachine()
+    limit = sum(fresh.compile().footprint().values()) + fresh.compile().dense_bytes() - 1
+    assert "dense" in autotune(fresh, SAMPLES, memory_limit=limit, repeat=1).skipped
+    assert fresh.footprint()["dense"] == 0
+
+    start = State("START")
+    regex_machine = MyFSM(start, TransitionTable().add(start, re.compile("[ab]"), start), OutputMapping().add(start, 1))
+    result = autotune(regex_machine, ["abba"], repeat=1)
+    assert "dense" in result.skipped and "dense" not in result.seconds
+
+def test_autotune_decision_is_persisted_by_content_hash(tmp_path):
+    """Test that a saved decision is reused by an identical machine without re-benchmarking."""
+    path = tmp_path / "tuning.json"
+    first = autotune(ModThreeMachine(), SAMPLES, path=path, repeat=1)
+    assert not first.reused
+    machine = ModThreeMachine()
+    second = autotune(machine, [], path=path)
+    assert second.reused and second.engine == first.engine == machine.engine
+    assert autotune(ModThreeMachine(), SAMPLES, path=path, memory_limit=1 << 30, repeat=1).reused is False
+
+def test_autotune_merges_decisions_saved_by_other_processes(tmp_path, monkeypatch):
+    """Test that a decision saved meanwhile by another process is kept when this one saves."""
+    path = tmp_path / "tuning.json"
+    load = autotune_module._load
+
+    def load_then_other_process_saves(target):
+        decisions = load(target)
+        monkeypatch.setattr(autotune_module, "_load", load)
+        autotune_module._save(target, "other-machine", {"engine": "scan"})
+        return decisions
+
+    monkeypatch.setattr(autotune_module, "_load", load_then_other_process_saves)
+    autotune(ModThreeMachine(), SAMPLES, path=path, repeat=1)
+    saved = autotune_module._load(path)
+    assert set(saved) == {"other-machine", ModThreeMachine().content_hash()}
+    assert [entry.name for entry in tmp_path.iterdir()] == ["tuning.json"]
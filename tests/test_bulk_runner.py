@@ -0,0 +1,78 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import re
+from multiprocessing import shared_memory
+import pytest
+import core.bulk_runner as bulk_runner
+from core.bulk_runner import BulkRunner
+from core.splitter import ListSplitter
+from core.state import State
+from core.transition_table import TransitionTable
+from core.finite_state_machine import FiniteStateMachine
+from machines.mod_three_machine import ModThreeMachine
+from machines.trap_state_machine import TrapStateMachine
+
+class MyFSM(FiniteStateMachine):
+    def calculate(self, input_symbol):
+        pass
+
+def test_bulk_runner_ordered_results():
+    """Test that results come back in input order across several chunks."""
+    records = [bin(i)[2:] for i in range(1000)]
+    with BulkRunner(ModThreeMachine(), processes=2, chunk_size=64, max_pending=2) as runner:
+        assert list(runner.run(records)) == [i % 3 for i in range(1000)]
+
+def test_bulk_runner_matches_calculate_for_trap_machine():
+    """Test that trap states and invalid symbols fail like calculate does."""
+    machine = TrapStateMachine()
+    with BulkRunner(TrapStateMachine(), processes=1, chunk_size=2) as runner:
+        results = list(runner.run(["01", "00", "1x", "1"], return_errors=True))
+    assert results[0] == machine.calculate("01")
+    assert isinstance(results[1], Exception) and "TRAP" in str(results[1])
+    assert isinstance(results[2], ValueError) and "No transition" in str(results[2])
+    assert results[3] == machine.calculate("1")
+
+def test_bulk_runner_raises_first_error():
+    """Test that a failing record raises its exception by default."""
+    with BulkRunner(ModThreeMachine(), processes=1) as runner:
+        with pytest.raises(ValueError) as excinfo:
+            list(runner.run(["1", "12"]))
+    assert "No transition" in str(excinfo.value)
+
+def test_bulk_runner_rejects_regex_tables():
+    """Test that machines with regex matchers cannot be densified."""
+    s0 = State("S0")
+    machine = MyFSM(s0, TransitionTable().add(s0, re.compile("[01]"), s0), {s0: 0})
+    with pytest.raises(ValueError) as excinfo:
+        BulkRunner(machine, processes=1)
+    assert "dense" in str(excinfo.value)
+
+def test_bulk_runner_unhashable_symbol_has_no_transition():
+    """Test that an unhashable symbol fails with the same error as calculate."""
+    machine = ModThreeMachine()
+    machine.splitter = ListSplitter()
+    with BulkRunner(machine, processes=1) as runner:
+        results = list(runner.run([["1", "1"], ["1", ["0"]]], return_errors=True))
+    assert results[0] == 0
+    assert isinstance(results[1], ValueError) and "No transition" in str(results[1])
+
+def test_bulk_runner_releases_shared_memory_when_pool_fails(monkeypatch):
+    """Test that the shared segment is unlinked if the worker pool cannot start."""
+    created = []
+
+    class RecordingSharedMemory(shared_memory.SharedMemory):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            created.append(self.name)
+
+    def failing_pool(*args, **kwargs):
+        raise OSError("cannot start workers")
+
+    monkeypatch.setattr(bulk_runner.shared_memory, "SharedMemory", RecordingSharedMemory)
+    monkeypatch.setattr(bulk_runner.multiprocessing, "Pool", failing_pool)
+    with pytest.raises(OSError):
+        BulkRunner(ModThreeMachine(), processes=1)
+    monkeypatch.undo()
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=created[0])
@@ -0,0 +1,122 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import re
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from core.state import State
+from core.output_mapping import OutputMapping
+from core.transition_table import TransitionTable
+from core.finite_state_machine import FiniteStateMachine
+from core.checkpoint import Checkpoint, run_with_checkpoints, resume
+from core.splitter import CommaStringSplitter, WhitespaceSplitter, RegexSplitter, StringSplitter, WholeStringSplitter
+from machines.mod_three_machine import ModThreeMachine
+from machines.parity_checker_machine import ParityCheckerMachine
+
+class MyFSM(FiniteStateMachine):
+    def calculate(self, input_symbol):
+        pass
+
+@pytest.mark.parametrize("splitter, text", [
+    (StringSplitter(), "abc"),
+    (CommaStringSplitter(), "a,bb,,c,"),
+    (WhitespaceSplitter(), "  one two\\tthree  four "),
+    (RegexSplitter(r";+"), "x;;y;z;;;w"),
+    (RegexSplitter(r"\s*"), "a b  c"),
+    (RegexSplitter(r"^a|;"), "ab;a;c"),
+    (RegexSplitter(r"a(bc)?"), "xabcyab"),
+    (WholeStringSplitter(), "whole text"),
+])
+def test_splitter_feed_matches_split(splitter, text):
+    """Test that feeding text in small chunks yields the same tokens as splitting it whole."""
+    for size in (1, 2, 3, len(text)):
+        tokens, pending = [], ""
+        for start in range(0, len(text), size):
+            chunk_tokens, pending = splitter.feed(pending, text[start:start + size], False)
+            tokens.extend(chunk_tokens)
+        chunk_tokens, pending = splitter.feed(pending, "", True)
+        tokens.extend(chunk_tokens)
+        assert tokens == list(splitter.split(text))
+
+@pytest.mark.parametrize("splitter", [WholeStringSplitter(), RegexSplitter(r"\s*")])
+def test_run_with_checkpoints_refuses_buffering_splitters(tmp_path, splitter):
+    """Test that splitters keeping the whole stream pending are refused instead of checkpointed."""
+    s0 = State("S0")
+    machine = MyFSM(s0, TransitionTable().add(s0, re.compile(".*"), s0), OutputMapping().add(s0, "ok"), splitter)
+    source = tmp_path / "input.txt"
+    source.write_text("a b c")
+    assert not splitter.incremental and RegexSplitter(r";+").incremental
+    with pytest.raises(ValueError):
+        run_with_checkpoints(machine, source, tmp_path / "run.ckpt")
+    assert not (tmp_path / "run.ckpt").exists()
+
+def test_concurrent_checkpoint_saves_do_not_collide(tmp_path):
+    """Test that writers saving to the same path at once each use their own temporary file."""
+    path = tmp_path / "run.ckpt"
+    checkpoints = [Checkpoint("hash", i, f"S{i}", i, "", i) for i in range(8)]
+    with ThreadPoolExecutor(4) as pool:
+        list(pool.map(lambda checkpoint: [checkpoint.save(path) for _ in range(20)], checkpoints))
+    assert Checkpoint.load(path).state_id in range(8)
+    assert [entry.name for entry in tmp_path.iterdir()] == ["run.ckpt"]
+
+def test_content_hash_stable_and_distinct():
+    """Test that equal machine definitions hash the same and different ones do not."""
+    assert ModThreeMachine().content_hash() == ModThreeMachine().content_hash()
+    assert ModThreeMachine().content_hash() != ParityCheckerMachine().content_hash()
+
+def test_run_with_checkpoints_result(tmp_path):
+    """Test that a checkpointed run returns the same output as calculate and cleans up."""
+    bits = "1101" * 5000
+    source = tmp_path / "input.txt"
+    source.write_text(bits)
+    checkpoint_path = tmp_path / "run.ckpt"
+    result = run_with_checkpoints(ModThreeMachine(), source, checkpoint_path, every_symbols=1000, chunk_size=777)
+    assert result == ModThreeMachine().calculate(bits)
+    assert not checkpoint_path.exists()
+
+def test_resume_after_crash(tmp_path):
+    """Test that a run interrupted by a bad symbol resumes from its last checkpoint."""
+    bits = "10" * 3000
+    source = tmp_path / "input.txt"
+    source.write_text(bits + "x" + bits)
+    checkpoint_path = tmp_path / "run.ckpt"
+    with pytest.raises(ValueError):
+        run_with_checkpoints(ModThreeMachine(), source, checkpoint_path, every_symbols=500, chunk_size=256)
+    checkpoint = Checkpoint.load(checkpoint_path)
+    assert 0 < checkpoint.offset <= len(bits)
+    # Repair the input after the checkpointed offset, then resume
+    source.write_text(bits + "0" + bits)
+    assert resume(ModThreeMachine(), source, checkpoint_path, chunk_size=256) == ModThreeMachine().calculate(bits + "0" + bits)
+
+@pytest.mark.parametrize("splitter", [StringSplitter(), CommaStringSplitter()])
+def test_resume_across_split_multibyte_characters(tmp_path, splitter):
+    """Test that checkpoints land on character boundaries and keep partial tokens."""
+    s0 = State("S0")
+    machine = MyFSM(s0, TransitionTable().add(s0, re.compile("[é,]*$"), s0), OutputMapping().add(s0, "ok"), splitter)
+    text = "éé,é," * 300
+    source = tmp_path / "input.txt"
+    source.write_text(text + "!" + text, encoding="utf-8")
+    checkpoint_path = tmp_path / "run.ckpt"
+    with pytest.raises(ValueError):
+        run_with_checkpoints(machine, source, checkpoint_path, every_symbols=1, chunk_size=3)
+    checkpoint = Checkpoint.load(checkpoint_path)
+    remaining = source.read_bytes()[checkpoint.offset:].decode("utf-8")
+    assert (text + "!" + text).endswith(checkpoint.pending + remaining)
+    assert len(checkpoint.pending + remaining) > len(text)
+    source.write_text(text + "é" + text, encoding="utf-8")
+    assert resume(machine, source, checkpoint_path, chunk_size=3) == "ok"
+
+def test_resume_rejects_other_machine(tmp_path):
+    """Test that a checkpoint cannot be resumed with a different machine."""
+    source = tmp_path / "input.txt"
+    source.write_text("1010")
+    checkpoint_path = tmp_path / "run.ckpt"
+    Checkpoint(ModThreeMachine().content_hash(), 2, "S2", 2, "", 2).save(checkpoint_path)
+    with pytest.raises(ValueError):
+        resume(ParityCheckerMachine(), source, checkpoint_path)
+    assert resume(ModThreeMachine(), source, checkpoint_path) == ModThreeMachine().calculate("1010")
+
+def test_resume_without_checkpoint(tmp_path):
+    """Test that resume requires an existing checkpoint."""
+    with pytest.raises(FileNotFoundError):
+        resume(ModThreeMachine(), tmp_path / "input.txt", tmp_path / "missing.ckpt")
@@ -0,0 +1,165 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
+from core.state import State
+from core.output_mapping import OutputMapping
+from core.transition_table import TransitionTable
+from core.compiled_machine import CompiledMachine, DENSE_CHUNK_BITS
+from machines.trap_state_machine import TrapStateMachine
+from machines.parity_checker_machine import ParityCheckerMachine
+
+def test_compiled_state_ids():
+    """Test that the initial state gets ID 0 and table states follow in insertion order."""
+    s0, s1, s2 = State("S0"), State("S1"), State("S2")
+    transitions = TransitionTable().add(s1, "a", s2).add(s0, "b", s1)
+    compiled = CompiledMachine(s0, transitions, OutputMapping())
+    assert compiled.states == [s0, s1, s2]
+    assert compiled.index[s2] == 2
+
+def test_compiled_outputs_from_dict_and_output_mapping():
+    """Test that dict and OutputMapping inputs are normalized to the same output list."""
+    s0, s1 = State("S0"), State("S1")
+    transitions = TransitionTable().add(s0, "a", s1)
+    from_dict = CompiledMachine(s0, transitions, {s0: "zero", s1: "one"})
+    from_mapping = CompiledMachine(s0, transitions, OutputMapping().add(s0, "zero").add(s1, "one"))
+    assert from_dict.outputs == from_mapping.outputs == ["zero", "one"]
+
+def test_compiled_trap_flags():
+    """Test that states mapped to exception classes are flagged and raise on output."""
+    s0, trap = State("S0"), State("TRAP")
+    transitions = TransitionTable().add(s0, "a", trap)
+    compiled = CompiledMachine(s0, transitions, {s0: 0, trap: ValueError})
+    assert list(compiled.trap_flags) == [0, 1]
+    assert compiled.output(0) == 0
+    with pytest.raises(ValueError) as excinfo:
+        compiled.output(1)
+    assert "TRAP" in str(excinfo.value)
+
+def test_compiled_step_missing_transition():
+    """Test that step returns -1 when no rule matches."""
+    s0 = State("S0")
+    compiled = CompiledMachine(s0, TransitionTable().add(s0, "a", s0), None)
+    assert compiled.step(0, "a") == 0
+    assert compiled.step(0, "b") == -1
+
+def test_fsm_recompiles_after_output_mapping_change():
+    """Test that the FSM sees outputs added after it was compiled."""
+    s0 = State("S0")
+    output_mapping = OutputMapping().add(s0, 0)
+    machine = TrapStateMachine()
+    machine.output_mapping = output_mapping
+    machine.initial_state = s0
+    machine.reset()
+    assert machine.get_output() == 0
+    output_mapping.add(s0, 5)
+    assert machine.get_output() == 5
+
+def test_fsm_sees_dict_style_output_change():
+    """Test that a machine built with a dict output mapping serves outputs changed after compiling."""
+    machine = ParityCheckerMachine()
+    assert machine.calculate("11") is False
+    machine.output_mapping[State("EVEN")] = "even"
+    assert machine.calculate("11") == "even"
+    assert isinstance(machine.output_mapping, OutputMapping)
+
+def test_fsm_keeps_dict_output_mapping_aliased():
+    """Test that changes made to the caller's dict after compiling are served, and the mapping acts like a dict."""
+    s0, s1 = State("S0"), State("S1")
+    outputs = {s0: "zero", s1: "one"}
+    machine = TrapStateMachine()
+    machine.transitions, machine.output_mapping, machine.initial_state = TransitionTable().add(s0, "a", s1), outputs, s0
+    machine.reset()
+    assert machine.calculate("a") == "one"
+    outputs[s1] = "changed"
+    assert machine.calculate("a") == "changed"
+    out = [None]
+    assert machine.transduce_into("a", out) == 1 and out == ["changed"]
+    assert machine.output_mapping.get(State("Z"), "default") == "default"
+    assert list(machine.output_mapping.values()) == ["zero", "changed"]
+    del machine.output_mapping[s0]
+    assert s0 not in outputs
+
+def test_fsm_recompiles_when_initial_state_changes():
+    """Test that a new initial state missing from the compiled index is picked up on reset."""
+    from machines.mod_three_machine import ModThreeMachine
+    machine = ModThreeMachine()
+    assert machine.calculate("11") == 0
+    machine.initial_state = State("Z")
+    machine.reset()
+    assert machine.current_state == State("Z") and machine.get_output() is None
+    machine.initial_state = State("S0")
+    assert machine.calculate("101") == 2
+
+def test_trap_machine_raises_from_compiled_outputs():
+    """Test that the bundled trap machine still raises when ending in TRAP."""
+    machine = TrapStateMachine()
+    assert machine.calculate("01") == 0
+    with pytest.raises(Exception) as excinfo:
+        machine.calculate("00")
+    assert "TRAP" in str(excinfo.value)
+
+def test_fsm_live_rule_update_patches_only_changed_rows():
+    """Test that a rule change patches the changed state's row and shares the others."""
+    from machines.mod_three_machine import ModThreeMachine
+    machine = ModThreeMachine()
+    machine.compile().dense()
+    old = machine.compile()
+    s0, s1 = State("S0"), State("S1")
+    machine.transitions.replace(s0, "1", s0)
+    new = machine.compile()
+    assert new is not old
+    assert new.rows[0] is not old.rows[0]
+    assert new.rows[1] is old.rows[1] and new.rows[2] is old.rows[2]
+    alphabet, table = new.dense_table()
+    assert table[new.index[s0] * 2 + alphabet["1"]] == new.index[s0]
+    assert old.step(0, "1") == 1 and new.step(0, "1") == 0
+    assert machine.calculate("111") == 0
+    machine.transitions.replace(s0, "1", s1)
+    assert machine.calculate("111") == 1
+
+def test_patched_dense_copies_only_touched_chunks():
+    """Test that a patch copies the dense chunk of the changed state and shares the others."""
+    count = 3 * (1 << DENSE_CHUNK_BITS)
+    states = [State(f"S{i}") for i in range(count)]
+    transitions = TransitionTable()
+    for i, state in enumerate(states):
+        transitions.add(state, "a", states[(i + 1) % count]).add(state, "b", states[i])
+    outputs = OutputMapping()
+    old = CompiledMachine(states[0], transitions, outputs)
+    old_chunks = old.dense()[1]
+    transitions.replace(states[-1], "b", states[0])
+    transitions.add(states[1], "a", State("EXTRA")).add(State("EXTRA"), "a", states[0])
+    new = old.patched(transitions, outputs)
+    chunks = new.dense()[1]
+    assert chunks[1] is old_chunks[1]
+    assert chunks[0] is not old_chunks[0] and chunks[2] is not old_chunks[2] and len(chunks) == 4
+    step = new.stepper("dense")
+    assert step(count - 1, "b") == 0 and old.stepper("dense")(count - 1, "b") == count - 1
+    assert step(1, "a") == 2 and step(new.index[State("EXTRA")], "a") == 0
+    assert all(step(i, symbol) == new.step(i, symbol) for i in range(len(new.states)) for symbol in "ab")
+
+def test_fsm_live_rule_update_adds_state():
+    """Test that adding a rule to a new state appends it without renumbering."""
+    s0, s1, s2 = State("S0"), State("S1"), State("NEW")
+    transitions = TransitionTable().add(s0, "a", s1).add(s1, "a", s0)
+    machine = TrapStateMachine()
+    machine.transitions, machine.output_mapping, machine.initial_state = transitions, {s0: 0, s1: 1}, s0
+    machine.reset()
+    old = machine.compile()
+    transitions.add(s1, "b", s2).add(s2, "a", s0)
+    new = machine.compile()
+    assert new.states[:2] == old.states and new.index[s2] == 2
+    assert len(old.states) == 2
+    machine.process("abaa")
+    assert machine.get_current_state() == s1
+
+def test_fsm_in_flight_run_keeps_old_version():
+    """Test that a transduce started before an update finishes on the old rules."""
+    from machines.mod_three_machine import ModThreeMachine
+    machine = ModThreeMachine()
+    stream = machine.transduce("1111")
+    assert next(stream) == 1
+    machine.transitions.replace(State("S1"), "1", State("S1"))
+    assert list(stream) == [0, 1, 0]
+    assert list(machine.transduce("1111")) == [1, 1, 1, 1]
@@ -0,0 +1,91 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import re
+import pytest
+from core.state import State
+from core.output_mapping import OutputMapping
+from core.transition_table import TransitionTable
+from core.finite_state_machine import FiniteStateMachine
+from core.splitter import CommaStringSplitter
+from core.types.input_type import CharRange
+from core.equivalence import equivalent, NO_TRANSITION
+from machines.mod_three_machine import ModThreeMachine
+
+class MyFSM(FiniteStateMachine):
+    def calculate(self, input_symbol):
+        pass
+
+def mod_three(names=("S0", "S1", "S2"), duplicate=False):
+    """Mod-three machine, optionally with a redundant copy of S0 that the minimal machine merges."""
+    s0, s1, s2 = (State(name) for name in names)
+    s0_copy = State("S0_copy") if duplicate else s0
+    transitions = (
+        TransitionTable()
+        .add(s0, "0", s0_copy).add(s0, "1", s1)
+        .add(s1, "0", s2).add(s1, "1", s0)
+        .add(s2, "0", s1).add(s2, "1", s2)
+    )
+    outputs = OutputMapping().add(s0, 0).add(s1, 1).add(s2, 2)
+    if duplicate:
+        transitions.add(s0_copy, "0", s0).add(s0_copy, "1", s1)
+        outputs.add(s0_copy, 0)
+    return MyFSM(s0, transitions, outputs)
+
+def test_equivalent_machines_with_different_state_names():
+    """Test that renamed and non-minimal versions of the same machine are equivalent."""
+    assert equivalent(ModThreeMachine(), mod_three(("A", "B", "C")))
+    result = equivalent(ModThreeMachine(), mod_three(duplicate=True))
+    assert result.equivalent and result.counterexample is None
+
+def test_shortest_counterexample():
+    """Test that a differing machine yields a shortest input on which the outputs disagree."""
+    changed = mod_three()
+    changed.transitions.replace(State("S2"), "1", State("S0"))
+    result = equivalent(ModThreeMachine(), changed)
+    assert not result
+    assert result.counterexample == ["1", "0", "1"]
+    assert result.outputs == (2, 0)
+    changed.process("101")
+    assert changed.get_output() == 0
+
+def test_missing_transition_is_distinguishing():
+    """Test that a transition present in only one machine is reported as reaching no transition."""
+    partial = mod_three()
+    partial.transitions.remove(State("S1"), "0")
+    result = equivalent(ModThreeMachine(), partial)
+    assert result.counterexample == ["1", "0"]
+    assert result.outputs == (2, NO_TRANSITION)
+
+def test_char_ranges_and_regex_classes_compared_by_interval():
+    """Test that a CharRange rule and an equivalent regex class are compared over range boundaries."""
+    start, word, other = State("START"), State("WORD"), State("OTHER")
+    def machine(matcher, last_matcher="z"):
+        transitions = TransitionTable().add(start, matcher, word).add(start, CharRange("0", "9"), other)
+        transitions.add(word, CharRange("a", last_matcher), word)
+        return MyFSM(start, transitions, OutputMapping().add(start, "s").add(word, "w").add(other, "o"))
+    assert equivalent(machine(CharRange("a", "z")), machine(re.compile("[a-z]")))
+    result = equivalent(machine(CharRange("a", "z")), machine(re.compile("[a-y]")))
+    assert result.counterexample == ["z"]
+    result = equivalent(machine(CharRange("a", "z")), machine(CharRange("a", "z"), "m"))
+    assert result.counterexample == ["a", "n"]
+
+def test_trap_outputs_compare_by_class():
+    """Test that exception outputs of trap states compare by class identity."""
+    start, trap = State("START"), State("TRAP")
+    def machine(error):
+        transitions = TransitionTable().add(start, "x", trap)
+        return MyFSM(start, transitions, OutputMapping().add(start, 0).add(trap, error))
+    assert equivalent(machine(ValueError), machine(ValueError))
+    assert equivalent(machine(ValueError), machine(KeyError)).counterexample == ["x"]
+
+def test_unenumerable_matchers_need_explicit_alphabet():
+    """Test that regexes on multi-character tokens raise unless an alphabet is given."""
+    start, number = State("START"), State("NUMBER")
+    def machine(pattern):
+        transitions = TransitionTable().add(start, re.compile(pattern), number)
+        return MyFSM(start, transitions, OutputMapping().add(number, 1), CommaStringSplitter())
+    with pytest.raises(ValueError):
+        equivalent(machine(r"\d+"), machine(r"[0-9]+"))
+    assert equivalent(machine(r"\d+"), machine(r"[0-9]+"), alphabet=["1", "12", "x"])
+    assert equivalent(machine(r"\d+"), machine(r"[0-8]"), alphabet=["9", "1"]).counterexample == ["9"]
@@ -8,6 +8,8 @@ from core.output_mapping import OutputMapping
 from core.state import State
 from core.finite_state_machine import FiniteStateMachine
 from core.transition_table import TransitionTable
+from machines.mod_three_machine import ModThreeMachine
+from machines.trap_state_machine import TrapStateMachine
 
 class MyFSM(FiniteStateMachine):
     def calculate(self, input_symbol):
@@ -164,3 +166,50 @@ def test_fsm_validate_reports_errors():
     assert any("Ambiguous transition" in e for e in errors)
     # s2 has no outgoing transitions, so for all inputs except those defined, missing transitions will be reported
     assert any("Missing transition" in e for e in errors)
+
+def test_fsm_transduce_empty_input():
+    """FSM transduce yields nothing for empty input and leaves the FSM in its initial state."""
+    s0 = State("S0")
+    output_mapping = OutputMapping().add(s0, 0)
+    fsm = MyFSM(initial_state=s0, transitions=TransitionTable(), output_mapping=output_mapping)
+    assert list(fsm.transduce("")) == []
+    assert fsm.get_current_state() == s0
+
+def test_fsm_transduce_raises_on_trap_state():
+    """FSM transduce raises the mapped exception when a trap state is entered."""
+    s0 = State("S0")
+    trap = State("TRAP")
+    transitions = TransitionTable().add(s0, "a", s0).add(s0, "b", trap)
+    output_mapping = {s0: 0, trap: Exception}
+    fsm = MyFSM(initial_state=s0, transitions=transitions, output_mapping=output_mapping)
+    stream = fsm.transduce("aab")
+    assert next(stream) == 0
+    assert next(stream) == 0
+    with pytest.raises(Exception) as excinfo:
+        next(stream)
+    assert "TRAP" in str(excinfo.value)
+
+def test_fsm_calculate_many_collects_errors_by_position():
+    """calculate_many matches calculate, stops at the first error, or records errors by position."""
+    machine = TrapStateMachine()
+    inputs = ["01", "00", "x", "011"]
+    errors = {}
+    results = machine.calculate_many(inputs, errors)
+    assert sorted(errors) == [1, 2] and isinstance(errors[2], ValueError)
+    assert results[1] is None and results[2] is None
+    assert results[0] == TrapStateMachine().calculate("01") and results[3] == TrapStateMachine().calculate("011")
+    with pytest.raises(Exception):
+        machine.calculate_many(inputs)
+    assert machine.calculate_many(["01"]) == [results[0]]
+
+def test_fsm_calculate_many_uses_overridden_calculate():
+    """calculate_many calls a subclass's own calculate instead of the batched fast path."""
+    class Labelled(ModThreeMachine):
+        def calculate(self, binary_string):
+            return f"remainder={super().calculate(binary_string)}"
+
+    machine = Labelled()
+    errors = {}
+    assert machine.calculate_many(["101", "2", "11"], errors) == ["remainder=2", None, "remainder=0"]
+    assert list(errors) == [1]
+    assert ModThreeMachine().calculate_many(["101"]) == [2]
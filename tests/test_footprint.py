@@ -0,0 +1,49 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import re
+import tracemalloc
+from core.footprint import deep_sizeof, component_sizes
+from machines.mod_three_machine import ModThreeMachine
+
+def test_deep_sizeof_follows_nested_objects_once():
+    """Test that nested containers are included and shared objects are counted once."""
+    inner = ["x" * 1000]
+    assert deep_sizeof([inner]) > sys.getsizeof([inner]) + 1000
+    assert deep_sizeof([inner, inner]) == deep_sizeof([inner]) + 8
+    assert deep_sizeof(ValueError) == deep_sizeof(None) == 0
+
+def test_deep_sizeof_does_not_grow_measured_objects():
+    """Test that measuring instances does not leave memory behind (no instance dicts are built)."""
+    class Point:
+        def __init__(self, x):
+            self.x = x
+            self.y = [x]
+    points = [Point(i) for i in range(2000)]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    assert deep_sizeof(points) > 2000 * sys.getsizeof(points[0])
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    assert retained < 2000 * 16
+
+def test_deep_sizeof_counts_compiled_regex():
+    """Test that compiled patterns include their code, pattern string and group names."""
+    small, large = re.compile("a"), re.compile("|".join(f"(?P<g{i}>word{i})" for i in range(50)))
+    assert deep_sizeof(large) > deep_sizeof(small) + len(large.pattern)
+
+def test_component_sizes_attribute_shared_objects_to_first():
+    """Test that an object reachable from two components is counted in the first only."""
+    shared = "y" * 1000
+    sizes = component_sizes([("first", ([shared],)), ("second", ([shared],))])
+    assert sizes["first"] - sizes["second"] == deep_sizeof(shared)
+
+def test_machine_footprint_components():
+    """Test that a machine reports bytes per component and that building the dense table shows up."""
+    machine = ModThreeMachine()
+    sizes = machine.footprint()
+    assert set(sizes) == {"states", "matchers", "rules", "rows", "intervals", "dispatch", "outputs", "dense",
+                          "table", "output_mapping", "splitter"}
+    assert sizes["dense"] == 0 and sizes["rows"] > 0 and sizes["states"] > 0
+    machine.compile().dense()
+    assert machine.footprint()["dense"] > 0
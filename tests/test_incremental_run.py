@@ -0,0 +1,74 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import random
+import pytest
+from core.incremental_run import IncrementalRun
+from machines.mod_three_machine import ModThreeMachine
+from machines.trap_state_machine import TrapStateMachine
+
+def test_incremental_run_initial_results():
+    """Test that a fresh run reports the same final state and prefix states as process."""
+    bits = "1101001110"
+    run = IncrementalRun(ModThreeMachine(), bits)
+    machine = ModThreeMachine()
+    assert len(run) == len(bits)
+    assert run.output() == machine.calculate(bits)
+    for prefix in range(len(bits) + 1):
+        machine.process(bits[:prefix])
+        assert run.state_at(prefix) == machine.get_current_state()
+
+def test_incremental_run_random_edits():
+    """Test that replace, insert and delete keep results equal to a full recomputation."""
+    rng = random.Random(7)
+    bits = [rng.choice("01") for _ in range(500)]
+    run = IncrementalRun(ModThreeMachine(), "".join(bits))
+    machine = ModThreeMachine()
+    for _ in range(300):
+        operation = rng.choice(["replace", "insert", "delete"])
+        if operation == "replace" and bits:
+            position = rng.randrange(len(bits))
+            bits[position] = rng.choice("01")
+            run.replace(position, bits[position])
+        elif operation == "insert":
+            position = rng.randrange(len(bits) + 1)
+            bits.insert(position, rng.choice("01"))
+            run.insert(position, bits[position])
+        elif bits:
+            position = rng.randrange(len(bits))
+            del bits[position]
+            run.delete(position)
+        assert run.output() == machine.calculate("".join(bits))
+    assert run.symbols() == bits
+    prefix = rng.randrange(len(bits) + 1)
+    machine.process("".join(bits[:prefix]))
+    assert run.state_at(prefix) == machine.get_current_state()
+
+def test_incremental_run_invalid_symbol():
+    """Test that an invalid symbol raises like process, and fixing it recovers."""
+    run = IncrementalRun(ModThreeMachine(), "1011")
+    run.replace(2, "x")
+    with pytest.raises(ValueError) as excinfo:
+        run.final_state()
+    assert "No transition for S2 on 'x'" in str(excinfo.value)
+    assert run.state_at(2).name == "S2"
+    run.replace(2, "1")
+    assert run.output() == int("1011", 2) % 3
+
+def test_incremental_run_trap_output():
+    """Test that ending in a trap state raises from output."""
+    run = IncrementalRun(TrapStateMachine(), "0101")
+    assert run.output() == 0
+    run.insert(0, "0")
+    with pytest.raises(Exception) as excinfo:
+        run.output()
+    assert "TRAP" in str(excinfo.value)
+
+def test_incremental_run_positions_checked():
+    """Test that out-of-range edits raise IndexError."""
+    run = IncrementalRun(ModThreeMachine(), "")
+    assert run.final_state().name == "S0"
+    with pytest.raises(IndexError):
+        run.delete(0)
+    run.insert(0, "1")
+    assert run.final_state().name == "S1"
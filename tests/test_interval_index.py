@@ -0,0 +1,111 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import re
+import pytest
+from core.state import State
+from core.output_mapping import OutputMapping
+from core.transition_table import TransitionTable
+from core.transition_rule import TransitionRule
+from core.finite_state_machine import FiniteStateMachine
+from core.compiled_machine import CompiledMachine
+from core.interval_index import regex_to_ranges, MAX_CODEPOINT
+from core.types.input_type import CharRange
+from core.splitter import WhitespaceSplitter
+
+class MyFSM(FiniteStateMachine):
+    def calculate(self, input_symbol):
+        self.process(input_symbol)
+        return self.get_output()
+
+def test_char_range_rule_matches():
+    """Test that a CharRange matcher accepts single characters inside its bounds only."""
+    rule = TransitionRule(State("A"), CharRange("a", "z"), State("B"))
+    assert rule.matches("a") and rule.matches("q") and rule.matches("z")
+    assert not rule.matches("A")
+    assert not rule.matches("ab")
+    assert not rule.matches(1)
+
+def test_char_range_invalid_bounds():
+    """Test that CharRange rejects multi-character and reversed bounds."""
+    with pytest.raises(TypeError):
+        CharRange("ab", "z")
+    with pytest.raises(ValueError):
+        CharRange("z", "a")
+
+@pytest.mark.parametrize("pattern, expected", [
+    (r"a", [(97, 97)]),
+    (r"[a-z]", [(97, 122)]),
+    (r"[a-z0-9_]+$", [(48, 57), (95, 95), (97, 122)]),
+    (r"^(?:x|[0-2])", [(48, 50), (120, 120)]),
+    (r"[^\x00-\x7f]", [(128, MAX_CODEPOINT)]),
+    (r".", [(0, 9), (11, MAX_CODEPOINT)]),
+    (r"[a-z]{2}", []),
+    (r"a{2,}", []),
+    (r"a{2}|[0-9]+", [(48, 57)]),
+])
+def test_regex_to_ranges(pattern, expected):
+    """Test that plain character classes convert to codepoint ranges."""
+    assert regex_to_ranges(re.compile(pattern)) == expected
+
+@pytest.mark.parametrize("pattern", [r"\d", r"ab", r"[a-z]*", r"(?i)[a-z]", r"[a-z]{0,2}"])
+def test_regex_to_ranges_unconvertible(pattern):
+    """Test that categories, sequences, optional repeats and flags are not converted."""
+    assert regex_to_ranges(re.compile(pattern)) is None
+
+def test_compiled_intervals_first_rule_wins():
+    """Test that overlapping ranges resolve to the earliest rule, like the rule scan."""
+    s0, letters, vowels, digits = State("S0"), State("L"), State("V"), State("D")
+    transitions = (
+        TransitionTable()
+        .add(s0, CharRange("a", "z"), letters)
+        .add(s0, re.compile("[aeiou]"), vowels)
+        .add(s0, re.compile("[0-9]"), digits)
+        .add(s0, "end", s0)
+    )
+    compiled = CompiledMachine(s0, transitions, OutputMapping())
+    assert compiled.intervals[0] is not None
+    for symbol in ["a", "e", "z", "5", "A", "!", "é", "end", "zz"]:
+        expected = next((compiled.index[r.to_state] for r in transitions.get_rules(s0) if r.matches(symbol)), -1)
+        assert compiled.step(0, symbol) == expected
+
+def test_compiled_intervals_repeat_minimum_above_one():
+    """Test that a rule needing two or more characters never takes a single-character symbol."""
+    s0, pair, letter = State("S0"), State("PAIR"), State("LETTER")
+    transitions = TransitionTable().add(s0, re.compile("[a-z]{2}"), pair).add(s0, CharRange("a", "z"), letter)
+    compiled = CompiledMachine(s0, transitions, OutputMapping())
+    assert compiled.step(0, "a") == compiled.index[letter]
+    assert compiled.step(0, "ab") == compiled.index[pair]
+
+def test_compiled_intervals_skipped_for_unconvertible_regex():
+    """Test that a state with a regex that is not a character class keeps the rule scan."""
+    s0 = State("S0")
+    transitions = TransitionTable().add(s0, re.compile(r"\d"), s0).add(s0, "a", s0)
+    compiled = CompiledMachine(s0, transitions, OutputMapping())
+    assert compiled.intervals[0] is None
+    assert compiled.step(0, "7") == 0
+    assert compiled.step(0, "b") == -1
+
+def test_unicode_lexer_machine():
+    """Test a small lexer over Unicode ranges, with multi-character tokens falling back to the rules."""
+    start, word, number = State("START"), State("WORD"), State("NUMBER")
+    transitions = (
+        TransitionTable()
+        .add(start, [CharRange("a", "z"), CharRange("Ѐ", "ӿ")], word)
+        .add(start, re.compile("[0-9]"), number)
+        .add(word, [CharRange("a", "z"), CharRange("Ѐ", "ӿ")], word)
+        .add(number, re.compile("[0-9]"), number)
+    )
+    output_mapping = OutputMapping().add(start, "empty").add(word, "word").add(number, "number")
+    fsm = MyFSM(start, transitions, output_mapping)
+    assert fsm.calculate("abc") == "word"
+    assert fsm.calculate("привет") == "word"
+    assert fsm.calculate("123") == "number"
+    with pytest.raises(ValueError):
+        fsm.calculate("12a")
+    fsm.splitter = WhitespaceSplitter()
+    assert fsm.calculate("7") == "number"
+    # Multi-character tokens take the rule scan, where re.match accepts a matching prefix
+    assert fsm.calculate("77") == "number"
+    with pytest.raises(ValueError):
+        fsm.calculate("ab")
@@ -0,0 +1,96 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
+from core.state import State
+from core.output_mapping import OutputMapping
+from core.transition_table import TransitionTable
+from core.finite_state_machine import FiniteStateMachine
+from core.machine_cache import MachineCache, acquire, default_cache
+from machines.mod_three_machine import ModThreeMachine
+
+class MyFSM(FiniteStateMachine):
+    def calculate(self, input_symbol):
+        self.process(input_symbol)
+        return self.get_output()
+
+def counter(symbol):
+    """One-state machine; different symbols give different content hashes but equal sizes."""
+    start = State("START")
+    return MyFSM(start, TransitionTable().add(start, symbol, start), OutputMapping().add(start, symbol))
+
+def size_of(machine):
+    return sum(machine.compile().footprint().values())
+
+def test_identical_definitions_share_compiled_form():
+    """Test that tenants with equal definitions share rows and that hits and saved time are counted."""
+    cache = MachineCache()
+    first, second = ModThreeMachine(), ModThreeMachine()
+    cache.acquire(first)
+    cache.acquire(second)
+    assert second.compile().rows is first.compile().rows
+    assert second.calculate("1011") == 11 % 3
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 0.5
+    assert stats["compile_seconds_saved"] == stats["compile_seconds"] > 0
+    assert stats["bytes"] == size_of(first)
+
+def test_tenants_get_their_own_mutable_outputs():
+    """Test that tenants sharing an entry are served their own output objects, not the first tenant's."""
+    cache = MachineCache()
+    first, second = counter("a"), counter("a")
+    first.output_mapping.add(State("START"), {"tags": []})
+    second.output_mapping.add(State("START"), {"tags": []})
+    cache.acquire(first)
+    cache.acquire(second)
+    assert second.compile().rows is first.compile().rows
+    first.calculate("a")["tags"].append("tenant-a-secret")
+    assert second.calculate("a") == {"tags": []}
+    assert second.calculate("a") is second.output_mapping.get(State("START"))
+
+def test_live_update_does_not_leak_into_shared_entry():
+    """Test that a rule change on one tenant patches its own copy only."""
+    cache = MachineCache()
+    changed, other = ModThreeMachine(), ModThreeMachine()
+    cache.acquire(changed)
+    cache.acquire(other)
+    changed.transitions.replace(State("S2"), "1", State("S0"))
+    assert changed.calculate("101") == 0
+    assert other.calculate("101") == 2
+    late = ModThreeMachine()
+    cache.acquire(late)
+    assert late.calculate("101") == 2
+
+def test_lru_eviction_under_byte_budget_and_pinning():
+    """Test that the least recently used unpinned entry is evicted once over budget."""
+    budget = size_of(counter("a")) * 2
+    cache = MachineCache(max_bytes=budget)
+    a, b, c = counter("a"), counter("b"), counter("c")
+    cache.pin(a)
+    cache.acquire(b)
+    cache.acquire(c)
+    assert a in cache and b not in cache and c in cache
+    assert cache.evictions == 1 and cache.bytes <= budget
+    cache.acquire(counter("b"))
+    assert a in cache and c not in cache
+    cache.unpin(a)
+    with pytest.raises(KeyError):
+        cache.unpin(a)
+
+def test_oversized_machine_is_compiled_but_not_cached():
+    """Test that a machine above the whole budget still runs but is not kept or pinnable."""
+    cache = MachineCache(max_bytes=64)
+    machine = ModThreeMachine()
+    cache.acquire(machine)
+    assert machine.calculate("11") == 0
+    assert len(cache) == 0 and cache.bytes == 0
+    with pytest.raises(ValueError):
+        cache.pin(machine)
+
+def test_default_cache_is_process_wide():
+    """Test that the module-level acquire uses one shared cache."""
+    machine = ModThreeMachine()
+    acquire(machine)
+    assert default_cache() is default_cache()
+    assert machine.content_hash() in default_cache()
@@ -126,3 +126,33 @@ def test_mod_three_special_characters():
     with pytest.raises(ValueError) as excinfo:
         fsm.calculate("1010!@#")
     assert "No transition" in str(excinfo.value)
+
+# Test streaming per-symbol outputs (running remainder of every prefix)
+def test_mod_three_transduce_prefixes():
+    fsm = ModThreeMachine()
+    binary_string = "110101"
+    expected = [int(binary_string[:i], 2) % 3 for i in range(1, len(binary_string) + 1)]
+    assert list(fsm.transduce(binary_string)) == expected
+    assert fsm.get_output() == expected[-1]
+
+def test_mod_three_transduce_into_array():
+    from array import array
+    fsm = ModThreeMachine()
+    binary_string = "1" * 50
+    out = array('b', bytes(len(binary_string)))
+    assert fsm.transduce_into(binary_string, out) == len(binary_string)
+    assert list(out) == [int(binary_string[:i], 2) % 3 for i in range(1, len(binary_string) + 1)]
+
+def test_mod_three_transduce_into_buffer_too_small():
+    fsm = ModThreeMachine()
+    with pytest.raises(IndexError):
+        fsm.transduce_into("1010", [None] * 3)
+
+def test_mod_three_transduce_invalid_input():
+    fsm = ModThreeMachine()
+    stream = fsm.transduce("10a1")
+    assert next(stream) == 1
+    assert next(stream) == 2
+    with pytest.raises(ValueError) as excinfo:
+        next(stream)
+    assert "No transition" in str(excinfo.value)
@@ -2,6 +2,7 @@ import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import pytest
+from collections.abc import MutableMapping
 from core.state import State
 from core.output_mapping import OutputMapping
 
@@ -57,4 +58,26 @@ def test_output_mapper_get_non_state():
     mapper = OutputMapping()
     with pytest.raises(TypeError) as excinfo:
         mapper.get("1") is None
-    assert "to be of type 'State'" in str(excinfo.value)
\ No newline at end of file
+    assert "to be of type 'State'" in str(excinfo.value)
+
+def test_output_mapper_is_a_mutable_mapping():
+    """Test that OutputMapping supports the dict-style interface and versions deletions."""
+    s1, s2 = State("A"), State("B")
+    mapper = OutputMapping().add(s1, 1)
+    assert isinstance(mapper, MutableMapping)
+    mapper.update({s2: 2})
+    assert dict(mapper) == {s1: 1, s2: 2} and list(mapper.keys()) == [s1, s2]
+    version = mapper._version
+    assert mapper.pop(s1) == 1 and mapper._version > version
+    assert mapper.setdefault(s1, 3) == 3 and mapper == {s1: 3, s2: 2}
+
+def test_output_mapper_from_dict_aliases():
+    """Test that from_dict wraps the dict itself, while copy() detaches from it."""
+    s1 = State("A")
+    outputs = {s1: 1}
+    mapper = OutputMapping.from_dict(outputs)
+    copy = mapper.copy()
+    outputs[s1] = 2
+    mapper[State("B")] = 3
+    assert mapper.get(s1) == 2 and State("B") in outputs
+    assert copy.get(s1) == 1 and State("B") not in copy
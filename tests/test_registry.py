@@ -0,0 +1,55 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import subprocess
+import pytest
+from core.state import State
+from machines import available_machines, get_machine, machine_timings
+from machines.mod_three_machine import ModThreeMachine
+
+def test_registry_discovers_bundled_machines():
+    """Test that every *_machine module is registered by name."""
+    assert available_machines() == ["mod_three", "parity_checker", "trap_state"]
+
+def test_registry_does_not_import_eagerly():
+    """Test that importing the package and listing machines does not import machine modules."""
+    code = (
+        "import sys; import machines; machines.available_machines(); "
+        "assert not any(name.endswith('_machine') for name in sys.modules), sorted(sys.modules)"
+    )
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    subprocess.run([sys.executable, "-c", code], cwd=root, check=True)
+
+def test_get_machine_handles_share_definition():
+    """Test that handles share the compiled definition but keep their own state."""
+    first = get_machine("mod_three")
+    second = get_machine("mod_three")
+    assert isinstance(first, ModThreeMachine)
+    assert first.compile().rows is second.compile().rows
+    assert first.calculate("1011") == 2
+    assert second.get_current_state().name == "S0"
+    assert second.calculate("11") == 0
+    assert first.get_output() == 2
+
+def test_get_machine_handle_updates_are_isolated():
+    """Test that a live update on one handle leaves other and later handles unchanged."""
+    other = get_machine("mod_three")
+    changed = get_machine("mod_three")
+    changed.transitions.replace(State("S2"), "1", State("S0"))
+    changed.output_mapping.add(State("S1"), "one")
+    assert changed.calculate("101") == 0
+    assert changed.calculate("1") == "one"
+    assert other.calculate("101") == 2
+    assert get_machine("mod_three").calculate("101") == 2
+    assert get_machine("mod_three").calculate("1") == 1
+
+def test_get_machine_reports_timings():
+    """Test that import and build times are recorded for loaded machines."""
+    get_machine("parity_checker")
+    timings = machine_timings()["parity_checker"]
+    assert timings["import_seconds"] >= 0 and timings["build_seconds"] >= 0
+
+def test_get_machine_unknown_name():
+    """Test that unknown names raise KeyError."""
+    with pytest.raises(KeyError):
+        get_machine("does_not_exist")
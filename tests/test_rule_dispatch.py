@@ -0,0 +1,74 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import re
+import pytest
+from core.state import State
+from core.output_mapping import OutputMapping
+from core.transition_table import TransitionTable
+from core.compiled_machine import CompiledMachine
+from core.rule_dispatch import RuleDispatch
+from core.types.input_type import CharRange
+
+TOKENS = ["if", "else", "x", "x1", "42", "4", "ifx", "", "_", "+", "==", 42, 4, True, "é", "IF"]
+
+def scan(transitions, state, index, symbol):
+    for rule in transitions.get_rules(state):
+        if rule.matches(symbol):
+            return index[rule.to_state]
+    return -1
+
+@pytest.mark.parametrize("rules", [
+    [("if", "KW"), (re.compile(r"[a-z_]\w*"), "ID"), (re.compile(r"\d+"), "NUM"), ("else", "KW")],
+    [(re.compile(r"[a-z_]\w*"), "ID"), ("if", "KW"), (re.compile(r"\d+"), "NUM"), (42, "INT")],
+    [(4, "INT"), (re.compile(r"(\d)(\d)?"), "NUM"), (CharRange("a", "z"), "CHAR"), (re.compile(r"=+|\+"), "OP")],
+    [(True, "BOOL"), (CharRange("0", "9"), "DIGIT"), (re.compile(r"(?P<word>[a-z]+)"), "ID"), ("IF", "KW")],
+])
+def test_dispatch_matches_rule_scan(rules):
+    """Test that the merged dispatch picks the same rule as scanning in order, for every token."""
+    start = State("START")
+    transitions = TransitionTable()
+    for matcher, target in rules:
+        transitions.add(start, matcher, State(target))
+    compiled = CompiledMachine(start, transitions, OutputMapping())
+    dispatch = compiled.dispatch[0]
+    assert dispatch is not None
+    for token in TOKENS:
+        assert dispatch.resolve(token) == scan(transitions, start, compiled.index, token), token
+        assert compiled.step(0, token) == scan(transitions, start, compiled.index, token), token
+
+@pytest.mark.parametrize("pattern", [re.compile(r"(a)\1"), re.compile("a", re.IGNORECASE), re.compile(rb"a")])
+def test_dispatch_not_built_for_unmergeable_patterns(pattern):
+    """Test that backreferences, flags and bytes patterns keep the rule scan."""
+    start = State("START")
+    transitions = TransitionTable().add(start, pattern, start).add(start, "b", start)
+    compiled = CompiledMachine(start, transitions, OutputMapping())
+    assert compiled.dispatch[0] is None
+
+def test_dispatch_unhashable_symbol_falls_back_to_scan():
+    """Test that unhashable symbols are resolved by the rule scan."""
+    start = State("START")
+    transitions = TransitionTable().add(start, re.compile(r"\["), start)
+    compiled = CompiledMachine(start, transitions, OutputMapping())
+    assert compiled.dispatch[0].resolve(["x"]) == 0
+    assert compiled.dispatch[0].resolve({"x"}) == -1
+
+def test_dispatch_one_regex_call_per_token():
+    """Test that the state's regex rules are merged into a single pattern."""
+    start = State("START")
+    transitions = TransitionTable()
+    for i in range(50):
+        transitions.add(start, re.compile(f"tok{i}$"), State(f"T{i}"))
+    dispatch = CompiledMachine(start, transitions, OutputMapping()).dispatch[0]
+    assert isinstance(dispatch, RuleDispatch)
+    assert dispatch.pattern.pattern.count("|") == 49
+    assert dispatch.resolve("tok37") == 1 + 37
+
+def test_literal_only_states_skip_interval_index():
+    """Test that literal-only states resolve through the dispatch dict alone, without an interval index."""
+    s0, s1 = State("S0"), State("S1")
+    transitions = TransitionTable().add(s0, "a", s1).add(s0, "b", s0).add(s1, re.compile("[a-z]"), s0)
+    compiled = CompiledMachine(s0, transitions, OutputMapping())
+    assert compiled.intervals[0] is None and compiled.dispatch[0] is not None
+    assert compiled.intervals[1] is not None
+    assert [compiled.step(0, symbol) for symbol in ["a", "b", "c", 1, ["a"]]] == [1, 0, -1, -1, -1]
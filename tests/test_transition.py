@@ -1,6 +1,7 @@
 import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
 from core.state import State
 from core.transition_table import TransitionTable
 
@@ -58,3 +59,45 @@ def test_transition_table_no_rules_for_state():
     s2 = State("B")
     transitions = TransitionTable().add(s1, "x", s2)
     assert transitions.get_rules(State("C")) == []
+
+def test_transition_table_remove():
+    """Test that remove drops matching rules and raises when nothing matches."""
+    s1 = State("A")
+    s2 = State("B")
+    transitions = TransitionTable().add(s1, "x", s2).add(s1, "y", s1)
+    transitions.remove(s1, "x")
+    assert [rule.input_matcher for rule in transitions.get_rules(s1)] == ["y"]
+    with pytest.raises(ValueError):
+        transitions.remove(s1, "x")
+
+def test_transition_table_replace_keeps_order():
+    """Test that replace redirects a rule in place."""
+    s1 = State("A")
+    s2 = State("B")
+    transitions = TransitionTable().add(s1, "x", s2).add(s1, "y", s1)
+    transitions.replace(s1, "x", s1)
+    assert [(rule.input_matcher, rule.to_state) for rule in transitions.get_rules(s1)] == [("x", s1), ("y", s1)]
+
+def test_transition_table_changes_since():
+    """Test that changed from_states are tracked by version."""
+    s1 = State("A")
+    s2 = State("B")
+    transitions = TransitionTable().add(s1, "x", s2)
+    version = transitions._version
+    transitions.add(s2, "y", s1).replace(s1, "x", s1)
+    assert transitions.changes_since(version) == [s2, s1]
+    assert transitions.changes_since(transitions._version) == []
+
+def test_transition_table_copy_on_write():
+    """Test that a copy shares rules until changed and that changes on either side stay local."""
+    s0, s1 = State("S0"), State("S1")
+    original = TransitionTable().add(s0, "a", s1).add(s1, "b", s0)
+    clone = original.copy()
+    assert clone.get_rules(s0) is original.get_rules(s0)
+    version = clone._version
+    assert version == original._version and clone.changes_since(version) == []
+    clone.add(s0, "c", s0)
+    original.replace(s1, "b", s1)
+    assert original.get(s0, "c") is None and original.get(s1, "b") == s1
+    assert clone.get(s0, "c") == s0 and clone.get(s1, "b") == s0
+    assert clone.changes_since(version) == [s0]
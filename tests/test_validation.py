@@ -0,0 +1,57 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from core.state import State
+from core.output_mapping import OutputMapping
+from core.transition_table import TransitionTable
+from core.finite_state_machine import FiniteStateMachine
+from machines.mod_three_machine import ModThreeMachine
+from machines.trap_state_machine import TrapStateMachine
+
+class MyFSM(FiniteStateMachine):
+    def calculate(self, input_symbol):
+        pass
+
+def test_validation_report_valid_machine():
+    """Test that a complete, deterministic machine produces an empty report."""
+    report = ModThreeMachine().validation_report()
+    assert report.is_valid()
+    assert report.unreachable == report.dead == report.missing == report.ambiguous == []
+
+def test_validation_report_structured_results():
+    """Test that unreachable states, missing and ambiguous transitions are reported as states and inputs."""
+    s0, s1, s2 = State("S0"), State("S1"), State("S2")
+    transitions = (
+        TransitionTable()
+        .add(s0, "a", s1)
+        .add(s1, "b", s0)
+        .add(s1, "b", s2)
+        .add(s2, "a", s2)
+        .add(State("S3"), "a", s0)
+    )
+    report = MyFSM(s0, transitions, OutputMapping()).validation_report()
+    # S2 is only the target of a rule shadowed by the first (S1, "b") rule
+    assert report.unreachable == [s2, State("S3")]
+    assert report.ambiguous == [(s1, "b")]
+    assert set(report.missing) == {(s0, "b"), (s1, "a"), (s2, "b"), (State("S3"), "b")}
+    assert not report.is_valid()
+
+def test_validation_report_dead_trap_state():
+    """Test that a state that can only reach exception outputs is reported as dead."""
+    report = TrapStateMachine().validation_report()
+    assert report.dead == [State("TRAP")]
+    assert report.is_valid()
+
+def test_validation_without_compiling_matches_compiled():
+    """Test that validating from the table gives the compiled report and builds no compiled form."""
+    count = 1000
+    states = [State(f"S{i}") for i in range(count)]
+    transitions = TransitionTable()
+    for i, state in enumerate(states):
+        transitions.add(state, "0", states[(2 * i) % count]).add(state, "1", states[(2 * i + 1) % (count - 1)])
+    fsm = MyFSM(states[0], transitions, OutputMapping())
+    report = fsm.validation_report()
+    assert fsm._compiled is None
+    fsm.compile()
+    assert vars(fsm.validation_report()) == vars(report)
+    assert report.unreachable == [states[-1]] and report.is_valid() is False